@@ -0,0 +1,99 @@
+"""Micro-benchmark for stats.utils.format_strings.
+
+Decodes a batch of real-sized `session_results` and `session_laps`
+payloads with the current implementation and the original one.
+
+Usage:
+    PYTHONPATH=. python bench/format_strings.py [races] [drivers] [laps]
+"""
+
+
+import sys
+import copy
+import time
+from urllib.parse import unquote_plus
+
+from synthetic import session_laps
+from synthetic import session_results
+
+from irace.stats import utils
+
+
+def original_format_strings(results: dict) -> None:
+    """The format_strings implementation prior to the fast path."""
+
+    if isinstance(results, (list, tuple)):
+        for result in results:
+            original_format_strings(result)
+        return
+
+    for key, value in results.items():
+        if isinstance(value, str):
+            results[key] = unquote_plus(unquote_plus(results[key]))
+        elif isinstance(value, (list, tuple)):
+            for nested in value:
+                original_format_strings(nested)
+        elif isinstance(value, dict):
+            original_format_strings(value)
+
+
+def _payloads(races: int, drivers: int, laps: int) -> list:
+    """Build the encoded payloads."""
+
+    payloads = []
+    custids = list(range(1000, 1000 + drivers))
+    for race in range(races):
+        payloads.append(session_results(
+            race,
+            custids,
+            laps=laps,
+            classes=3,
+            encoded=True,
+        ))
+        payloads.extend(
+            session_laps(race, custid, laps=laps, encoded=True)
+            for custid in custids
+        )
+    return payloads
+
+
+def _time(func, payloads: list) -> float:
+    """Time func over a fresh copy of the payloads."""
+
+    payloads = copy.deepcopy(payloads)
+    start = time.perf_counter()
+    for payload in payloads:
+        func(payload)
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+
+    races, drivers, laps = [
+        int(x) for x in (sys.argv[1:] + ["20", "60", "60"][len(sys.argv) - 1:])
+    ]
+
+    payloads = _payloads(races, drivers, laps)
+
+    expected = copy.deepcopy(payloads)
+    original_format_strings(expected)
+    actual = copy.deepcopy(payloads)
+    utils.format_strings(actual)
+    assert actual == expected, "format_strings output differs"
+
+    before = _time(original_format_strings, payloads)
+    after = _time(utils.format_strings, payloads)
+
+    print("{} payloads ({} races x {} drivers x {} laps)".format(
+        len(payloads),
+        races,
+        drivers,
+        laps,
+    ))
+    print("original:    {:.3f}s".format(before))
+    print("fast path:   {:.3f}s ({:.1f}x)".format(after, before / after))
+
+
+if __name__ == "__main__":
+    main()
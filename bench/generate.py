@@ -0,0 +1,328 @@
+"""Benchmark irace-generate against synthetic storage.
+
+Run from the repository root as `PYTHONPATH=. python bench/generate.py`.
+Synthetic storage is populated in a new temporary directory, removed
+afterwards unless --keep is given. Pass --path to reuse it between runs.
+
+With --curve, one dimension of the scale is varied and each point is run
+in its own process, for example `--curve=drivers=500,1000,2000,4000`.
+Growth is the exponent of time against that dimension between points,
+around 1 is linear, 2 quadratic. Phase columns (with --phases) are CPU
+seconds, since generate writes drivers from a pool of threads.
+
+Usage:
+    generate.py [options]
+
+Options:
+    -h --help            show this message
+    --leagues=<n>        number of leagues [default: 5]
+    --seasons=<n>        seasons per league [default: 4]
+    --races=<n>          races per season [default: 10]
+    --drivers=<n>        members per league [default: 2000]
+    --field=<n>          drivers per race [default: 30]
+    --laps=<n>           laps per driver per race [default: 20]
+    --classes=<n>        car classes per race [default: 1]
+    --path=<path>        working directory, temporary if not given
+    --jobs=<n>           generate worker processes [default: 1]
+    --lap-files          write laps to per driver files
+    --format=<n>         output format version [default: 1]
+    --phases             time each generate phase (adds some overhead)
+    --curve=<dim=n,...>  run each value of one scale dimension
+    --report=<file>      also write the results as JSON
+    --json               print the results as JSON, used by --curve
+    --keep               keep the generated output for comparison
+"""
+
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import resource
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from docopt import docopt
+
+from synthetic import populate_storage
+
+
+SCALE = (
+    "--leagues",
+    "--seasons",
+    "--races",
+    "--drivers",
+    "--field",
+    "--laps",
+    "--classes",
+)
+OUTPUTS = ("leagues", "seasons", "races", "laps", "drivers")
+
+
+def _populate(path: str, scale: dict) -> dict:
+    """Populate synthetic storage at path, returning the counts."""
+
+    # pylint: disable=import-outside-toplevel
+    from irace.storage import FileServer
+    return populate_storage(FileServer(path), **scale)
+
+
+def _storage(args: dict) -> str:
+    """Populate (or reuse) the synthetic storage, return its path."""
+
+    scale = "-".join(args[x] for x in SCALE)
+    path = os.path.join(args["--path"], "results-{}".format(scale))
+
+    if not os.path.isdir(path):
+        # in another process, to keep it out of our peak RSS
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            counts = executor.submit(_populate, path, {
+                x.lstrip("-"): int(args[x]) for x in SCALE
+            }).result()
+        print("populated {} in {:.1f}s: {}".format(
+            path,
+            time.perf_counter() - start,
+            counts,
+        ), file=sys.stderr)
+
+    return path
+
+
+def _output_bytes(output: str) -> dict:
+    """Return the bytes written by kind, from the output path layout."""
+
+    totals = dict.fromkeys(OUTPUTS, 0)
+    for root, _, files in os.walk(output):
+        relpath = os.path.relpath(root, output)
+        parts = [] if relpath == "." else relpath.split(os.sep)
+        if parts[:1] == ["drivers"]:
+            kind = "drivers"
+        else:
+            kind = OUTPUTS[min(len(parts), len(OUTPUTS) - 2)]
+        for name in files:
+            if name.endswith(".json") and not name.startswith("."):
+                totals[kind] += os.path.getsize(os.path.join(root, name))
+    return totals
+
+
+def _phases(generate):
+    """Return the generate phases, with the summaries of interest."""
+
+    # pylint: disable=import-outside-toplevel
+    from irace.parse import Race
+    from irace.parse import Season
+
+    phases = generate._profile_phases()  # pylint: disable=protected-access
+    phases.update({
+        "season_summary": ((Season, "summary"),),
+        "driver_summary": ((Race, "driver_summary"),),
+    })
+    return phases
+
+
+def run(args: dict) -> dict:
+    """Run generate once, returning the results."""
+
+    results = _storage(args)
+
+    # work on a copy, generate writes its partial driver results to storage
+    work = os.path.join(args["--path"], "work")
+    output = os.path.join(args["--path"], "dist")
+    for path in (work, output):
+        shutil.rmtree(path, ignore_errors=True)
+    shutil.copytree(results, work)
+    os.environ["IRACE_RESULTS"] = work
+
+    # pylint: disable=import-outside-toplevel
+    from irace import generate
+    from irace.profiler import Profiler
+
+    jobs = int(args["--jobs"])
+    gen_args = {
+        "--output": output,
+        "--lap-files": args["--lap-files"],
+        "--format": int(args["--format"]),
+    }
+
+    profiler = None
+    if args["--phases"]:
+        profiler = Profiler(None, detail=False)
+        profiler.patch(_phases(generate))
+        profiler.enter("other")
+
+    start = time.perf_counter()
+    if jobs > 1:
+        generate.write_templates_parallel(gen_args, jobs)
+    else:
+        generate.write_templates(gen_args)
+    seconds = time.perf_counter() - start
+
+    phases = {}
+    if profiler:
+        profiler.exit()
+        profiler.restore()
+        phases = {name: {
+            "calls": totals["calls"],
+            "seconds": totals["seconds"],
+            "cpu_seconds": totals["cpu_seconds"],
+            "max_rss_kib": totals["max_rss_kib"],
+        } for name, totals in profiler.summary.items()}
+
+    result = {
+        "scale": {x.lstrip("-"): int(args[x]) for x in SCALE},
+        "seconds": round(seconds, 3),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "output_bytes": _output_bytes(output),
+        "phases": phases,
+    }
+
+    if not args["--keep"]:
+        shutil.rmtree(output, ignore_errors=True)
+    shutil.rmtree(work, ignore_errors=True)
+
+    return result
+
+
+def _print(result: dict) -> None:
+    """Print the results of a single run."""
+
+    print("generate: {:.2f}s".format(result["seconds"]))
+    print("peak rss: {:,d} KiB".format(result["max_rss_kib"]))
+    print("output: {}".format(", ".join(
+        "{} {:,d}B".format(k, v) for k, v in result["output_bytes"].items()
+    )))
+    for name, totals in result["phases"].items():
+        print("  {:<16} {:>8.3f}s CPU {:>9,d} calls".format(
+            name,
+            totals["cpu_seconds"],
+            totals["calls"],
+        ))
+
+
+def _growth(previous: dict, current: dict, dim: str, key) -> str:
+    """Return the growth exponent of key between two curve points."""
+
+    try:
+        return "{:.2f}".format(math.log(
+            key(current) / key(previous)
+        ) / math.log(
+            current["scale"][dim] / previous["scale"][dim]
+        ))
+    except (ValueError, ZeroDivisionError, KeyError):
+        return "-"
+
+
+def _print_curve(dim: str, results: list) -> None:
+    """Print the scaling curve of the results."""
+
+    names = sorted({x for result in results for x in result["phases"]})
+    rows = [["point", dim, "seconds", "growth", "rss KiB", "out KiB"]]
+    rows[0].extend(names)
+
+    for i, result in enumerate(results):
+        row = [
+            str(i + 1),
+            str(result["scale"][dim]),
+            "{:.3f}".format(result["seconds"]),
+            "-" if not i else _growth(
+                results[i - 1],
+                result,
+                dim,
+                lambda x: x["seconds"],
+            ),
+            "{:,d}".format(result["max_rss_kib"]),
+            "{:,d}".format(sum(result["output_bytes"].values()) // 1024),
+        ]
+        for name in names:
+            cell = "{:.3f}".format(
+                result["phases"].get(name, {}).get("cpu_seconds", 0.0)
+            )
+            if i:
+                cell += " ({})".format(_growth(
+                    results[i - 1],
+                    result,
+                    dim,
+                    lambda x, n=name: x["phases"][n]["cpu_seconds"],
+                ))
+            row.append(cell)
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(x.rjust(w) for x, w in zip(row, widths)))
+
+
+def curve(args: dict) -> list:
+    """Run each point of the curve in its own process."""
+
+    try:
+        dim, values = args["--curve"].split("=", 1)
+        values = [int(x) for x in values.split(",")]
+    except ValueError:
+        raise SystemExit("--curve must be given as dimension=n,n,...")
+    if "--{}".format(dim) not in SCALE:
+        raise SystemExit("--curve dimension must be one of: {}".format(
+            ", ".join(x.lstrip("-") for x in SCALE)
+        ))
+
+    results = []
+    for value in values:
+        command = [sys.executable, __file__, "--json"]
+        for key, arg in sorted(args.items()):
+            if key in ("--curve", "--report", "--json"):
+                continue
+            if key == "--{}".format(dim):
+                arg = str(value)
+            if arg is True:
+                command.append(key)
+            elif arg not in (False, None):
+                command.append("{}={}".format(key, arg))
+
+        output = subprocess.run(
+            command,
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+        print("{}={}: {:.2f}s".format(dim, value, results[-1]["seconds"]),
+              file=sys.stderr)
+
+    _print_curve(dim, results)
+    return results
+
+
+def main():
+    """Run the benchmark."""
+
+    args = docopt(__doc__)
+
+    temporary = not args["--path"]
+    if temporary:
+        # shared by the points of a curve, which are passed --path
+        args["--path"] = tempfile.mkdtemp(prefix="irace-bench-")
+        print("working in {}".format(args["--path"]), file=sys.stderr)
+
+    if args["--curve"]:
+        results = curve(args)
+    else:
+        results = run(args)
+        if args["--json"]:
+            print(json.dumps(results))
+        else:
+            _print(results)
+
+    if args["--report"]:
+        with open(args["--report"], "w") as open_file:
+            json.dump(results, open_file, indent=4, sort_keys=True)
+
+    if temporary and not args["--keep"]:
+        shutil.rmtree(args["--path"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark the race page summary of a single large race.
+
+Run from the repository root as `PYTHONPATH=. python bench/race.py`.
+
+Usage:
+    race.py [options]
+
+Options:
+    -h --help            show this message
+    --drivers=<n>        drivers in the race [default: 60]
+    --classes=<n>        car classes in the race [default: 3]
+    --laps=<n>           laps per driver [default: 200]
+    --repeat=<n>         number of timed runs [default: 20]
+"""
+
+
+import time
+
+from docopt import docopt
+
+from irace.parse import Laps
+from irace.parse import Race
+from irace.parse import Season
+from irace.stats import Client
+
+from synthetic import session_laps
+from synthetic import session_results
+
+
+LEAGUE = {"leagueid": 1, "leaguename": "Synthetic League"}
+SEASON = {"league_season_id": 1, "league_season_name": "Season 1"}
+SUBSESSIONID = 1000001
+
+
+def main():
+    """Run the benchmark."""
+
+    args = docopt(__doc__)
+    repeat = int(args["--repeat"])
+    laps = int(args["--laps"])
+
+    # no catalog lookups, car names are not part of the benchmark
+    Client.cache.update({"cars": {}, "__populated": True})
+
+    custids = list(range(100000, 100000 + int(args["--drivers"])))
+    race = {
+        "race": session_results(
+            SUBSESSIONID,
+            custids,
+            laps=laps,
+            classes=int(args["--classes"]),
+        ),
+        "laps": [
+            Laps(session_laps(SUBSESSIONID, custid, laps))
+            for custid in custids
+        ],
+    }
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        race_obj = Race(**race)
+        Season([race_obj], SEASON, LEAGUE).race_summary(SUBSESSIONID)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print("race of {} drivers in {} classes, {} laps, {} runs".format(
+        args["--drivers"],
+        args["--classes"],
+        laps,
+        repeat,
+    ))
+    print("min:    {:.1f}ms".format(timings[0] * 1000))
+    print("median: {:.1f}ms".format(timings[len(timings) // 2] * 1000))
+
+
+if __name__ == "__main__":
+    main()
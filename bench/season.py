@@ -0,0 +1,194 @@
+"""Benchmark Season summaries for a single large season.
+
+Run from the repository root as `PYTHONPATH=. python bench/season.py`.
+
+The indexed Season is timed against one with the lookups as they were
+before, scans and no cached standings. Exits non-zero if it is not
+--min-speedup times faster, or if their summaries differ.
+
+Usage:
+    season.py [options]
+
+Options:
+    -h --help            show this message
+    --drivers=<n>        drivers in the season [default: 60]
+    --rounds=<n>         races in the season [default: 30]
+    --laps=<n>           laps per driver per race [default: 20]
+    --repeat=<n>         number of timed runs [default: 20]
+    --min-speedup=<x>    required speedup over scanning [default: 1.2]
+"""
+
+
+import gc
+import time
+
+from docopt import docopt
+
+from irace.parse import Laps
+from irace.parse import Race
+from irace.parse import Season
+from irace.stats import Client
+
+from synthetic import calendar
+from synthetic import session_laps
+from synthetic import session_results
+
+
+LEAGUE = {"leagueid": 1, "leaguename": "Synthetic League"}
+SEASON = {"league_season_id": 1, "league_season_name": "Season 1"}
+
+
+class _RaceScan:
+    """Race lookups by scanning the season's races."""
+
+    def __init__(self, races: list):
+        self.races = races
+
+    def get(self, race_id: int):
+        """Return the race by subsessionid, None if not found."""
+
+        for race in self.races:
+            if race.subsessionid == race_id:
+                return race
+        return None
+
+    def __contains__(self, race_id: int) -> bool:
+        return self.get(race_id) is not None
+
+    def __setitem__(self, race_id: int, race) -> None:
+        """Races are found in the season's list."""
+
+
+class _ScanSeason(Season):
+    """Season with the lookups before indexing, as the baseline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._races = _RaceScan(self.races)
+
+    def _index_standings(self) -> None:
+        """Sort the standings on every use."""
+
+        self._standings = self._sorted_standings()
+
+    def _standing(self, driver_id: int):
+        """Scan the standings for the driver."""
+
+        for driver in self.standings:
+            if driver.driver_id == driver_id:
+                return driver
+        return None
+
+
+def _races(drivers: int, rounds: int, laps: int) -> list:
+    """Return a list of race and laps dictionaries for the season."""
+
+    custids = list(range(100000, 100000 + drivers))
+    return [{
+        "race": session_results(subsessionid, custids, laps=laps),
+        "laps": [
+            Laps(session_laps(subsessionid, custid, laps))
+            for custid in custids
+        ],
+    } for subsessionid in range(1000001, 1000001 + rounds)]
+
+
+def main():
+    """Run the benchmark."""
+
+    args = docopt(__doc__)
+    repeat = int(args["--repeat"])
+
+    # no catalog lookups, car names are not part of the benchmark
+    Client.cache.update({"cars": {}, "__populated": True})
+
+    races = _races(
+        int(args["--drivers"]),
+        int(args["--rounds"]),
+        int(args["--laps"]),
+    )
+    cal = calendar(
+        1,
+        1,
+        [x["race"]["subsessionid"] for x in races],
+        upcoming=10,
+    )
+
+    # runs of each implementation are interleaved, so both see the same
+    # machine load, and compared by their fastest run
+    classes = {"scan": _ScanSeason, "indexed": Season}
+    runs = {name: _runs(races, repeat) for name in classes}
+    timings = {name: [] for name in classes}
+    summaries = {}
+
+    gc.disable()
+    try:
+        for i in range(repeat):
+            for name, season_class in classes.items():
+                seconds, summaries[name] = _time(
+                    season_class,
+                    runs[name][i],
+                    cal,
+                )
+                timings[name].append(seconds)
+    finally:
+        gc.enable()
+
+    print("season of {} drivers x {} rounds, {} runs".format(
+        args["--drivers"],
+        args["--rounds"],
+        repeat,
+    ))
+    for name, seconds in timings.items():
+        seconds.sort()
+        print("{:8s} min: {:.1f}ms median: {:.1f}ms".format(
+            name,
+            seconds[0] * 1000,
+            seconds[len(seconds) // 2] * 1000,
+        ))
+
+    speedup = timings["scan"][0] / timings["indexed"][0]
+    print("speedup: {:.2f}x".format(speedup))
+
+    if summaries["indexed"] != summaries["scan"]:
+        raise SystemExit("FAIL: indexed summaries differ from scanning")
+    if speedup < float(args["--min-speedup"]):
+        raise SystemExit("FAIL: speedup below {}x".format(
+            args["--min-speedup"],
+        ))
+
+
+def _runs(races: list, repeat: int) -> list:
+    """Return fresh Race objects per run, their driver summaries built.
+
+    Race summaries are memoized up front so only the Season is timed.
+    """
+
+    runs = [[Race(**race) for race in races] for _ in range(repeat)]
+    for race_objs in runs:
+        for race in race_objs:
+            for result in race.results:
+                race.driver_summary(
+                    result["custid"],
+                    race_info=False,
+                    driver_info=True,
+                )
+    return runs
+
+
+def _time(season_class, race_objs: list, cal: dict) -> tuple:
+    """Time the season summaries, return the seconds and the summary."""
+
+    start = time.perf_counter()
+    season = season_class(race_objs, SEASON, LEAGUE, cal)
+    summary = season.summary()
+    season.league_summary  # pylint: disable=pointless-statement
+    for driver in season.standings:
+        season.driver_summary(driver.driver_id)
+    for race in race_objs:
+        season.race_summary(race.subsessionid)
+    return time.perf_counter() - start, summary
+
+
+if __name__ == "__main__":
+    main()
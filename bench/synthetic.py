@@ -0,0 +1,285 @@
+"""Synthetic iRacing payloads for benchmarks.
+
+Shapes follow the `stats.Client` responses closely enough for the parsing
+code, with values sized like a real league race.
+"""
+
+
+import random
+from urllib.parse import quote_plus
+
+from irace.storage import Databases
+
+
+TRACKS = (
+    ("Circuit de Spa-Francorchamps", "Grand Prix Pits"),
+    ("Road America", "Full Course"),
+    ("Watkins Glen International", "Boot"),
+    ("Autodromo Nazionale Monza", "Grand Prix"),
+    ("Mount Panorama Circuit", ""),
+)
+CLASSES = ("GTE", "GT3", "LMP2")
+CLUBS = ("New England", "Benelux", "Australia & NZ", "Iberia", "Canada")
+
+
+def encode(value: str) -> str:
+    """Double plus encode the value, like iRacing does."""
+
+    return quote_plus(quote_plus(value))
+
+
+def driver_name(custid: int) -> str:
+    """Return a display name for the customer ID."""
+
+    return "Driver {} O'Test-{}".format(custid, custid % 97)
+
+
+def session_results(subsessionid: int, drivers: list, league_id: int = 1,
+                    season_id: int = 1, laps: int = 30, classes: int = 1,
+                    encoded: bool = False) -> dict:
+    """Return a `session_results` payload for the customer IDs in drivers."""
+
+    rand = random.Random(subsessionid)
+    enc = encode if encoded else str
+    track, config = TRACKS[subsessionid % len(TRACKS)]
+
+    rows = []
+    for simsesname in ("PRACTICE", "QUALIFY", "RACE"):
+        order = list(drivers)
+        rand.shuffle(order)
+        class_pos = {}
+        for pos, custid in enumerate(order):
+            cls = CLASSES[custid % classes]
+            class_pos[cls] = class_pos.get(cls, -1) + 1
+            rows.append({
+                "simsesname": simsesname,
+                "custid": custid,
+                "groupid": custid,
+                "displayname": enc(driver_name(custid)),
+                "finishpos": pos,
+                "finishposinclass": class_pos[cls],
+                "startpos": rand.randrange(len(order)),
+                "ccNameShort": cls,
+                "ccName": enc("{} Class".format(cls)),
+                "carid": 100 + custid % 5,
+                "carnum": str(custid % 1000),
+                "clubshortname": enc(CLUBS[custid % len(CLUBS)]),
+                "clubname": enc("{} Club".format(CLUBS[custid % len(CLUBS)])),
+                "lapscomplete": laps - min(pos // 10, laps),
+                "incidents": rand.randrange(12),
+                "league_points": max(0, 50 - pos),
+                "reasonout": "Running",
+                "interval": 0 if pos == 0 else rand.randrange(10000, 900000),
+                "classinterval": (
+                    0 if class_pos[cls] == 0 else
+                    rand.randrange(10000, 900000)
+                ),
+                "bestlaptime": rand.randrange(900000, 950000),
+                "bestlapnum": rand.randrange(1, laps + 1),
+                "avglap": rand.randrange(900000, 990000),
+                "oldirating": rand.randrange(800, 5000),
+                "newirating": rand.randrange(800, 5000),
+                "oldsublevel": rand.randrange(100, 499),
+                "newsublevel": rand.randrange(100, 499),
+                "helmpattern": rand.randrange(60),
+                "helmcolor1": "{:06x}".format(rand.randrange(0xffffff)),
+                "helmcolor2": "{:06x}".format(rand.randrange(0xffffff)),
+                "helmcolor3": "{:06x}".format(rand.randrange(0xffffff)),
+                "carpattern": rand.randrange(60),
+                "carcolor1": "{:06x}".format(rand.randrange(0xffffff)),
+                "division": rand.randrange(10),
+                "weight_penalty_kg": 0,
+                "multiplier": 1,
+                "aggchampoints": rand.randrange(100),
+                "champpoints": rand.randrange(100),
+            })
+
+    return {
+        "subsessionid": subsessionid,
+        "leagueid": league_id,
+        "league_season_id": season_id,
+        "start_time": "2020-{:02d}-{:02d} 19:00:00".format(
+            1 + subsessionid % 12,
+            1 + subsessionid % 28,
+        ),
+        "simulatedstarttime": "2020-06-01 14:00",
+        "track_name": enc(track),
+        "track_config_name": enc(config),
+        "weather_temp_value": 78,
+        "weather_temp_units": 0,
+        "eventlapscomplete": laps,
+        "eventstrengthoffield": 2500,
+        "cornersperlap": 19,
+        "rows": rows,
+    }
+
+
+def session_laps(subsessionid: int, custid: int, laps: int = 30,
+                 encoded: bool = False) -> dict:
+    """Return a `session_laps` payload for one driver."""
+
+    rand = random.Random(subsessionid * 100000 + custid)
+    enc = encode if encoded else str
+
+    lap_data = []
+    ses_time = 0
+    best = None
+    for lap_num in range(laps + 1):
+        ses_time += rand.randrange(900000, 990000)
+        flags = 0
+        if rand.random() < 0.1:
+            flags |= rand.choice((1, 4, 32, 64))
+        if rand.random() < 0.02:
+            flags |= 2
+        lap_data.append({
+            "lap_num": lap_num,
+            "flags": flags,
+            "ses_time": ses_time,
+            "custid": custid,
+        })
+        if lap_num and (best is None or lap_data[-1]["ses_time"] -
+                        lap_data[-2]["ses_time"] < best[0]):
+            best = (lap_data[-1]["ses_time"] - lap_data[-2]["ses_time"],
+                    lap_num)
+
+    return {
+        "header": {
+            "subsessionid": subsessionid,
+            "track_name": enc(TRACKS[subsessionid % len(TRACKS)][0]),
+        },
+        "drivers": [{
+            "custid": custid,
+            "groupid": custid,
+            "displayname": enc(driver_name(custid)),
+            "bestlaptime": best[0] if best else -1,
+            "bestlapnum": best[1] if best else -1,
+            "helmpattern": 1,
+            "carnum": str(custid % 1000),
+        }],
+        "lapData": lap_data,
+    }
+
+
+def calendar(league_id: int, season_id: int, subsessionids: list,
+             upcoming: int = 2) -> dict:
+    """Return a `league_season_calendar` payload.
+
+    Includes a row per known race and `upcoming` future events.
+    """
+
+    rows = [{
+        "subsessionid": subsessionid,
+        "launchat": 1590000000000 + i * 604800000,
+        "track_name": TRACKS[subsessionid % len(TRACKS)][0],
+        "config_name": TRACKS[subsessionid % len(TRACKS)][1],
+        "cars": [{"car_name": "Mazda MX-5 Cup"}],
+    } for i, subsessionid in enumerate(subsessionids)]
+
+    rows.extend({
+        "subsessionid": 0,
+        "launchat": 4102444800000 + i * 604800000,  # 2100 onwards
+        "track_name": TRACKS[i % len(TRACKS)][0],
+        "config_name": TRACKS[i % len(TRACKS)][1],
+        "cars": [{"car_name": "Mazda MX-5 Cup"}],
+    } for i in range(upcoming))
+
+    return {
+        "leagueid": league_id,
+        "league_season_id": season_id,
+        "rowcount": len(rows),
+        "rows": rows,
+    }
+
+
+def populate_storage(server, leagues: int = 2, seasons: int = 2,
+                     races: int = 8, drivers: int = 40, field: int = 20,
+                     laps: int = 20, classes: int = 1) -> dict:
+    """Fill the storage server with a synthetic league history.
+
+    Args::
+
+        server: an `irace.storage.IServer` implementation
+        leagues: number of leagues
+        seasons: seasons per league
+        races: races per season
+        drivers: members per league (custids overlap between leagues)
+        field: drivers per race
+        laps: laps per driver per race
+        classes: car classes per race (multiclass if > 1)
+
+    Returns:
+        dictionary of counts written per database
+    """
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    counts = {}
+
+    def _write(database, sub_values, _id, data):
+        server.write(database.value, sub_values, _id, data)
+        counts[database.name] = counts.get(database.name, 0) + 1
+
+    _write(Databases.catalog, (), "cache", {
+        "updated": 4102444800,
+        "cars": {str(100 + i): {"id": 100 + i, "abbrevname": "CAR{}".format(
+            i
+        )} for i in range(5)},
+    })
+
+    subsessionid = 1000000
+    for league_id in range(1, leagues + 1):
+        _write(Databases.leagues, (), league_id, {
+            "leagueid": league_id,
+            "leaguename": "Synthetic League {}".format(league_id),
+        })
+
+        # half of each league's members are shared with the next league
+        first = 100000 + (league_id - 1) * drivers // 2
+        members = list(range(first, first + drivers))
+        for custid in members:
+            _write(Databases.members, (league_id,), custid, {
+                "custID": custid,
+                "displayName": driver_name(custid),
+            })
+
+        rand = random.Random(league_id)
+        for season_index in range(seasons):
+            season_id = league_id * 1000 + season_index
+            _write(Databases.seasons, (league_id,), season_id, {
+                "league_season_id": season_id,
+                "league_season_name": "Season {}".format(season_index + 1),
+            })
+
+            subsessionids = []
+            for _ in range(races):
+                subsessionid += 1
+                subsessionids.append(subsessionid)
+                entrants = rand.sample(members, min(field, len(members)))
+                _write(
+                    Databases.races,
+                    (league_id, season_id),
+                    subsessionid,
+                    session_results(
+                        subsessionid,
+                        entrants,
+                        league_id,
+                        season_id,
+                        laps,
+                        classes,
+                    ),
+                )
+                for custid in entrants:
+                    _write(
+                        Databases.laps,
+                        (league_id, season_id, subsessionid),
+                        custid,
+                        session_laps(subsessionid, custid, laps),
+                    )
+
+            _write(
+                Databases.calendars,
+                (league_id,),
+                season_id,
+                calendar(league_id, season_id, subsessionids),
+            )
+
+    return counts
@@ -0,0 +1,134 @@
+"""Persistent car/track catalog.
+
+The catalog (tracks, cars, car classes, seasons, etc) is parsed from the
+iRacing EventResult page into `stats.Client.cache` during login. It is
+stored here so other processes, irace-generate in particular, can fill
+`Client.cache` without credentials or network access.
+
+Note the following environment variables are used:
+
+    IRACE_CATALOG_TTL    seconds before refreshing the catalog [default: 1d]
+"""
+
+
+import os
+import time
+import threading
+
+from .stats import Client
+from .stats.logger import log
+from .storage import Server
+from .storage import Databases
+
+
+TTL = int(os.getenv("IRACE_CATALOG_TTL") or 86400)
+
+# cache keys stored in the catalog, those mapping integer ID to info
+LISTINGS = ("tracks", "cars", "car_class", "club", "division")
+OTHERS = ("season", "year_and_quarter")
+
+_ID = "cache"
+_LOCK = threading.Lock()
+_ATTEMPTED = threading.Event()
+
+
+def save() -> None:
+    """Store the current `Client.cache` in the catalog."""
+
+    if not Client.cache.get("__populated"):
+        log.warning("Client cache is not populated, not saving catalog")
+        return
+
+    catalog = snapshot()
+    catalog["updated"] = time.time()
+    Server.write(Databases.catalog, (), _ID, catalog)
+
+
+def _fill(catalog: dict) -> None:
+    """Fill `Client.cache` from the stored catalog."""
+
+    for key in LISTINGS:
+        # JSON object keys are always strings, the cache uses integer IDs
+        Client.cache[key] = {
+            int(_id): value for _id, value in
+            (catalog.get(key) or {}).items()
+        }
+
+    for key in OTHERS:
+        Client.cache[key] = catalog.get(key)
+
+    Client.cache["__populated"] = True
+
+
+def load(refresh: bool = False) -> bool:
+    """Ensure `Client.cache` is filled, from storage when possible.
+
+    The catalog is refreshed from iRacing when it is missing, older than
+    the TTL or refresh is True, but only if we have credentials. Otherwise
+    a stale catalog is used as-is.
+
+    Returns:
+        boolean if the cache was filled
+    """
+
+    with _LOCK:
+        _ATTEMPTED.set()
+
+        if Client.cache.get("__populated") and not refresh:
+            return True
+
+        catalog = {}
+        if Server.exists(Databases.catalog, (), _ID):
+            catalog = Server.read(Databases.catalog, (), _ID)
+
+        if catalog and not refresh and (
+                catalog.get("updated", 0) > time.time() - TTL or
+                not Client.has_credentials()):
+            _fill(catalog)
+            return True
+
+        if Client.has_credentials():
+            try:
+                Client.login(force=refresh)
+            except Exception as error:
+                log.warning("Failed to refresh the catalog: %r", error)
+            else:
+                save()
+                return bool(Client.cache.get("__populated"))
+
+        if catalog:
+            log.warning("Using a stale catalog")
+            _fill(catalog)
+            return True
+
+        log.warning("No stored catalog and no credentials to fetch it")
+        return False
+
+
+def snapshot() -> dict:
+    """Return the catalog items of `Client.cache`, empty if not populated.
+
+    Pass this to `install` in worker processes, rather than have each of
+    them `load` (and possibly login) on their own.
+    """
+
+    if not Client.cache.get("__populated"):
+        return {}
+    return {key: Client.cache[key] for key in LISTINGS + OTHERS}
+
+
+def install(catalog: dict) -> None:
+    """Fill `Client.cache` from a `snapshot`, `get` will not load."""
+
+    with _LOCK:
+        _ATTEMPTED.set()
+        if catalog:
+            _fill(catalog)
+
+
+def get(key: str):
+    """Return the catalog item by cache key, loading lazily."""
+
+    if not _ATTEMPTED.is_set() and not Client.cache.get("__populated"):
+        load()
+    return Client.cache[key]
@@ -15,163 +15,265 @@ Options:
     --output=<path>      output path [default: dist]
     --input=<path>       input path, from irace-populate [default: results]
     --update-db          update the processed content in couchDB
+    --jobs=<n>           worker processes, 1 to run in process [default: 1]
+    --gzip               also write precompressed .gz copies of output files
+    --lap-files          write laps to per driver files, not the race pages
+    --format=<n>         output format version, 2 for columnar laps
+                         [default: 1]
+    --profile=<dir>      write per phase profiles to the directory
 """
 
 
-import io
 import os
-import json
-import shutil
+import sys
+import time
+import threading
+import multiprocessing
 from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 
-from .stats import Client
+from . import output
+from . import catalog
 from .utils import get_args
 from .parse import Laps
-from .parse import Race
-from .parse import Season
 from .parse import League
+from .parse import Season
+from .parse import Registry
+from .parse.laps import FLAGS
+from .parse.laps import LAP_FORMATS
+from .profiler import profiled
 from .storage import Server
 from .storage import Databases
 from .stats.logger import log
 
 
+_COUNTERS = (
+    "queued",
+    "processed",
+    "to_file",
+    "to_db",
+    "nulls",
+    "duplicates_to_file",
+    "duplicates_to_db",
+)
+
+
 class Stats:
-    """Static stats object to track processing."""
+    """Thread safe stats object to track processing.
+
+    Counters are kept in per thread shards, summed when read. Progress is
+    logged at most once every `IRACE_PROGRESS_INTERVAL` seconds.
+    """
+
+    interval = float(os.getenv("IRACE_PROGRESS_INTERVAL") or 5)
 
     def __init__(self, amount: int = 1) -> None:
-        self._queued = amount
-        self._processed = 0
-        self._to_file = 0
-        self._to_db = 0
-        self._nulls = 0
-        self._duplicates_to_file = 0
-        self._duplicates_to_db = 0
+        self._init()
+        self._shard()["queued"] += amount
         self.log()
 
+    def _init(self) -> None:
+        """Set up our shards, lock and failures."""
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        self._failures = []
+        self._logged = 0.0
+
+    def __getstate__(self) -> dict:
+        """Pickle as the summed counters, for worker processes."""
+
+        return {"counters": self.counters, "failures": self.failures}
+
+    def __setstate__(self, state: dict) -> None:
+        self._init()
+        self._shard().update(state["counters"])
+        self._failures.extend(state["failures"])
+
+    def _shard(self) -> dict:
+        """Return the counters for the current thread."""
+
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = dict.fromkeys(_COUNTERS, 0)
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    @property
+    def counters(self) -> dict:
+        """Return the counters summed from all shards."""
+
+        with self._lock:
+            shards = list(self._shards)
+        return {
+            key: sum(shard[key] for shard in shards)
+            for key in _COUNTERS
+        }
+
+    @property
+    def failures(self) -> list:
+        """Return a list of (description, error) failures."""
+
+        with self._lock:
+            return list(self._failures)
+
     def log(self, level: int = 20) -> None:
         """Log our current state."""
 
-        if self._queued and not self._processed:
-            state = "{:,d} [queued]".format(self._queued)
-        elif self._processed < self._queued:
+        self._logged = time.monotonic()
+        counts = self.counters
+
+        if counts["queued"] and not counts["processed"]:
+            state = "{:,d} [queued]".format(counts["queued"])
+        elif counts["processed"] < counts["queued"]:
             state = "{:,d}/{:,d} [working]".format(
-                self._processed,
-                self._queued
+                counts["processed"],
+                counts["queued"]
             )
-        elif self._queued:
-            state = "{:,d} [finished]".format(self._queued)
+        elif counts["queued"]:
+            state = "{:,d} [finished]".format(counts["queued"])
         else:
             state = "[ready]"
 
         s_stats = [x for x in (
             state,
-            "[{} files]".format(self._to_file) if self._to_file else "",
+            "[{} files]".format(
+                counts["to_file"]
+            ) if counts["to_file"] else "",
             "[{} duplicate files]".format(
-                self._duplicates_to_file
-            ) if self._duplicates_to_file else "",
-            "[{} records]".format(self._to_db) if self._to_db else "",
+                counts["duplicates_to_file"]
+            ) if counts["duplicates_to_file"] else "",
+            "[{} records]".format(
+                counts["to_db"]
+            ) if counts["to_db"] else "",
             "[{} duplicate records]".format(
-                self._duplicates_to_db
-            ) if self._duplicates_to_db else "",
-            "[{} null results]".format(self._nulls) if self._nulls else "",
+                counts["duplicates_to_db"]
+            ) if counts["duplicates_to_db"] else "",
+            "[{} null results]".format(
+                counts["nulls"]
+            ) if counts["nulls"] else "",
+            "[{} failures]".format(
+                len(self._failures)
+            ) if self._failures else "",
         ) if x]
 
         log.log(level, ("%s " * (len(s_stats) - 1)) + "%s", *s_stats)
 
-    def consume(self, other) -> None:
-        """Consume stats from another instance."""
+    def _progress(self) -> None:
+        """Log our current state if the interval has passed."""
+
+        if time.monotonic() - self._logged < self.interval:
+            return
+
+        with self._lock:
+            if time.monotonic() - self._logged < self.interval:
+                return
+            self._logged = time.monotonic()
 
-        self._processed += other._processed
-        self._to_file += other._to_file
-        self._to_db += other._to_db
-        self._nulls += other._nulls
-        self._duplicates_to_file += other._duplicates_to_file
-        self._duplicates_to_db += other._duplicates_to_db
         self.log()
 
+    def consume(self, other, queued: bool = False) -> None:
+        """Consume stats from another instance.
+
+        Args::
+
+            other: Stats instance to consume
+            queued: also consume the queued count, if not already added
+        """
+
+        shard = self._shard()
+        for key, value in other.counters.items():
+            if queued or key != "queued":
+                shard[key] += value
+
+        failures = other.failures
+        if failures:
+            with self._lock:
+                self._failures.extend(failures)
+
+        self._progress()
+
     def inc(self, amount: int = 1) -> None:
         """Increment the processed count."""
 
-        self._processed += amount
-        self.log()
+        self._shard()["processed"] += amount
+        self._progress()
 
     def inc_written_to_file(self, amount: int = 1) -> None:
         """Increment the written to file count."""
 
-        self._to_file += amount
+        self._shard()["to_file"] += amount
 
     def inc_written_to_db(self, amount: int = 1) -> None:
         """Increment the written to db count."""
 
-        self._to_db += amount
+        self._shard()["to_db"] += amount
 
     def inc_nulls(self, amount: int = 1, _processed: bool = True) -> None:
         """Increment the amount of null results processed."""
 
-        self._nulls += amount
+        self._shard()["nulls"] += amount
         if _processed:
             self.inc(amount)
 
     def inc_duplicates_to_file(self, amount: int = 1) -> None:
         """Increment the amount of duplicate results processed (to file)."""
 
-        self._duplicates_to_file += amount
+        self._shard()["duplicates_to_file"] += amount
 
     def inc_duplicates_to_db(self, amount: int = 1) -> None:
         """Increment the amount of duplicate results processed (to db)."""
 
-        self._duplicates_to_db += amount
+        self._shard()["duplicates_to_db"] += amount
 
     def add(self, amount: int = 1) -> None:
         """Increase the amount queued."""
 
-        self._queued += amount
-        self.log()
+        self._shard()["queued"] += amount
+        self._progress()
 
+    def fail(self, description: str, error: Exception) -> None:
+        """Record a failure to process an item."""
 
-def _make_missing(path: str) -> None:
-    """Creates the directory at path if missing."""
+        log.debug("Failed to process %s", description, exc_info=error)
+        with self._lock:
+            self._failures.append((description, repr(error)))
 
-    if os.path.exists(path):
-        if not os.path.isdir(path):
-            raise SystemExit("Output directory exists as a file, aborting.")
-    else:
-        os.makedirs(path)
+    def report(self, limit: int = 20) -> int:
+        """Log our final state and any failures.
 
+        Returns:
+            integer count of failures
+        """
 
-def _read_json() -> dict:
-    """Read all JSON data."""
+        self.log()
+        failures = self.failures
+        for description, error in failures[:limit]:
+            log.error("Failed to process %s: %s", description, error)
+        if len(failures) > limit:
+            log.error("... and %d more failures", len(failures) - limit)
+        return len(failures)
 
-    leagues = Server.read_all(Databases.leagues)
+
+def _read_season(league_id: int, season: dict) -> dict:
+    """Read the races and laps of a single season."""
 
     return {
-        "leagues": leagues,
-        "data": {league["leagueid"]: {
-            "members": Server.read_all(
-                Databases.members,
-                (league["leagueid"],),
-            ),
-            "seasons": [{
-                "season": season,
-                "races": [{
-                    "race": race,
-                    "laps": [Laps(lap_data) for lap_data in Server.read_all(
-                        Databases.laps,
-                        (
-                            league["leagueid"],
-                            season["league_season_id"],
-                            race["subsessionid"],
-                        ),
-                    )],
-                } for race in Server.read_all(
-                    Databases.races,
-                    (league["leagueid"], season["league_season_id"]),
-                )],
-            } for season in Server.read_all(
-                Databases.seasons,
-                (league["leagueid"],),
+        "season": season,
+        "races": [{
+            "race": race,
+            "laps": [Laps(lap_data) for lap_data in Server.read_all(
+                Databases.laps,
+                (league_id, season["league_season_id"], race["subsessionid"]),
             )],
-        } for league in leagues},
+        } for race in Server.read_all(
+            Databases.races,
+            (league_id, season["league_season_id"]),
+        )],
     }
 
 
@@ -199,12 +301,11 @@ def _write_content(args: dict, database: Databases, sub_values: tuple,
 
         if args.get("--output"):
             path = os.path.join(
-                args["--output"],
                 *prefix,
                 *[str(x) for x in sub_values],
                 _id,
             )
-            if _write_json(content, path):
+            if output.write_json(args["manifest"], content, path):
                 stats.inc_written_to_file()
             else:
                 stats.inc_duplicates_to_file()
@@ -245,88 +346,86 @@ def _write_to_db(database: Databases, sub_values: tuple,
     raise RuntimeError("Cannot update content in couchDB, not connected!")
 
 
-def _write_json(content: object, path: str) -> bool:
-    """JSON dump the content and write it to path."""
+def _season_driver_results(season: dict, league: dict, drivers: set,
+                           models: Registry) -> dict:
+    """Return the driver results from a single season.
 
-    as_json = json.dumps(
-        content,
-        ensure_ascii=False,
-        separators=(",", ":"),
-    )
+    Args::
 
-    if os.path.isfile(path):
-        if as_json == _read_file(path):
-            log.log(5, "Identical content, ignoring: %s", path)
-            return False
+        season: dictionary from `_read_season`
+        league: league info dictionary
+        drivers: customer IDs to include (set or dict), None for all
+        models: Registry of parsed models to share
 
-    _make_missing(os.path.dirname(path))
+    Returns:
+        dictionary of {custid: {"results": [...], "season": {...}}}
+    """
 
-    with io.open(path, "w", encoding="utf-8") as open_file:
-        open_file.write(as_json)
+    races = [models.race(race) for race in season["races"]]
+    season_results = {}
 
-    log.log(5, "Wrote: %s", path)
-    return True
+    for race in races:
+        if not race.winner_id:
+            continue
 
+        for custid in dict.fromkeys(x.driver_id for x in race.laps):
+            if drivers is not None and custid not in drivers:
+                continue
+            result = race.driver_summary(custid, lap_info=False)
+            if result:
+                season_results.setdefault(custid, []).append(result)
 
-def _read_file(path: str) -> str:
-    """Read the content of file at path."""
+    if not season_results:
+        return {}
 
-    with io.open(path, "r", encoding="utf-8") as open_file:
-        return open_file.read()
+    season_obj = Season(races, season["season"], league)
+    return {custid: {
+        "results": results,
+        "season": season_obj.driver_summary(custid),
+    } for custid, results in season_results.items()}
 
 
-def _driver_league_results(data: dict, driver: dict) -> dict:
-    """Return all results for this driver from all leagues in data."""
+def _add_results(results: dict, season_results: dict) -> None:
+    """Add the results from `_season_driver_results` to the league's."""
 
-    results = {}
+    for custid, result in season_results.items():
+        results.setdefault(custid, []).append(result)
 
-    for league_id, _data in data["data"].items():
-        seasons = []
-        league_info = _league_info(data["leagues"], league_id)
 
-        for season in _data["seasons"]:
-            this_season = {
-                "results": [],
-                "_races": [],
-            }
+def _spill_driver_results(league_id: int, results: dict) -> None:
+    """Store a league's driver results, merged with those from others.
 
-            for race in season["races"]:
-                race = Race(**race)
-                this_season["_races"].append(race)
+    Args::
 
-                result = race.driver_summary(driver["custID"], lap_info=False)
+        league_id: league ID the results are from
+        results: dictionary of {custid: [season results]}
+    """
 
-                if result and race.winner_id:
-                    this_season["results"].append(result)
+    for custid, seasons in results.items():
+        cached = _read_driver_results(custid)
+        cached[str(league_id)] = seasons
+        Server.write(Databases.drivers, (), custid, cached)
 
-            if this_season["results"]:
-                this_season["season"] = Season(
-                    this_season.pop("_races"),
-                    season["season"],
-                    league_info,
-                ).driver_summary(driver["custID"])
-                seasons.append(this_season)
 
-        if seasons:
-            results[str(league_id)] = seasons
+def _read_driver_results(custid: int) -> dict:
+    """Return the stored results of the driver, if any."""
 
-    return results
+    if Server.exists(Databases.drivers, (), custid):
+        return Server.read(Databases.drivers, (), custid) or {}
+    return {}
 
 
-def driver_results(data: dict, driver: dict) -> dict:
-    """Pull all driver results from data and merge with cached."""
+def driver_results(driver: dict) -> dict:
+    """Return all stored driver results, {league_id: [season results]}."""
 
-    results = _driver_league_results(data, driver)
-    from_cache = Server.read(Databases.drivers, (), driver["custID"]) or {}
-    from_cache.update(results)
-    Server.write(Databases.drivers, (), driver["custID"], from_cache)
-    return from_cache
+    return _read_driver_results(driver["custID"])
 
 
-def _write_driver(args: dict, data: dict, driver: dict, stats: Stats) -> None:
+def _write_driver(args: dict, driver: dict, stats: Stats) -> None:
     """Write templated driver data to disk."""
 
-    res = driver_results(data, driver)
+    # read back from the drivers store, so result objects have sorted keys
+    res = driver_results(driver)
     if res:
         _write_content(
             args,
@@ -354,147 +453,427 @@ def _write_driver(args: dict, data: dict, driver: dict, stats: Stats) -> None:
         stats.inc_nulls()
 
 
-def _write_drivers(args: dict, data: dict, drivers: list) -> None:
-    """Write all driver data to disk."""
+def _write_drivers(args: dict, drivers: list) -> None:
+    """Write all driver data to disk, from the drivers database."""
 
-    # ensure the cache is populated
-    Client.login()
+    stats = args["stats"]
 
-    # per thread stats, update global once we're done
-    stats = Stats(len(drivers))
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        futures = {executor.submit(
+            _write_driver,
+            args,
+            driver,
+            stats,
+        ): driver for driver in drivers}
 
-    def _write_driver_async(driver):
-        _write_driver(args, data, driver, stats)
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as error:
+                stats.fail("driver {}".format(
+                    futures[future]["custID"]
+                ), error)
 
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        executor.map(_write_driver_async, drivers, timeout=30)
-
-    args["stats"].consume(stats)
-
-
-def _write_seasons(args: dict, seasons: list, league: dict) -> list:
-    """Write templated season data to disk."""
-
-    _seasons = []
-
-    for season in seasons:
-        season_races = []
-        args["stats"].add(len(season["races"]))
-        for race in season["races"]:
-            race_obj = Race(race["laps"], race["race"])
-            if race_obj.winner_id > 0:
-                season_races.append(race_obj)
-                _write_content(
-                    args,
-                    Databases.p_races,
-                    (league["leagueid"], season["season"]["league_season_id"]),
-                    race["race"]["subsessionid"],
-                    Season([race_obj], season["season"], league).race_summary(
-                        race_obj.subsessionid
-                    ),
-                )
-
-        if season_races:
-            season_obj = Season(
-                season_races,
-                season["season"],
-                league,
-                Server.read(
-                    Databases.calendars,
-                    (league["leagueid"],),
-                    season["season"]["league_season_id"],
-                ),
-            )
-            _seasons.append(season_obj)
 
-            _write_content(
-                args,
-                Databases.p_seasons,
-                (league["leagueid"],),
-                season["season"]["league_season_id"],
-                season_obj.summary(),
-            )
+def _lap_format(args: dict) -> int:
+    """Return the output format version of lap lists."""
 
-    return _seasons
+    return int(args.get("--format") or 1)
 
 
-def _league_info(leagues: list, league: int) -> dict:
-    """Return the basic information dictionary for this league."""
+def _versioned(lap_format: int, content: dict) -> dict:
+    """Return the content with its format version, if not the first."""
 
-    for info in leagues:
-        if info["leagueid"] == league:
-            return info
-    return {}
+    if lap_format > 1 and content:
+        return dict(content, format=lap_format)
+    return content
+
+
+def _write_lap_files(args: dict, race) -> None:
+    """Write the laps of each driver in the race to their own file."""
+
+    lap_format = _lap_format(args)
+    drivers = list(dict.fromkeys(x["custid"] for x in race.results))
+    args["stats"].add(len(drivers))
+    for custid in drivers:
+        _write_content(
+            args,
+            Databases.p_laps,
+            (
+                race.race["leagueid"],
+                race.race["league_season_id"],
+                race.subsessionid,
+            ),
+            custid,
+            _versioned(lap_format, race.lap_summary(custid, lap_format)),
+        )
 
 
-def _write_top_level(args: dict, data: dict) -> None:
-    """Write top level files."""
+def _write_season(args: dict, season: dict, league: dict):
+    """Write templated data for a single season.
+
+    Returns:
+        the Season object, None if the season has no results
+    """
+
+    args["stats"].add(len(season["races"]))
+    season_races = [
+        race for race in
+        (args["models"].race(x) for x in season["races"])
+        if race.winner_id > 0
+    ]
+    if not season_races:
+        return None
+
+    season_obj = Season(
+        season_races,
+        season["season"],
+        league,
+        Server.read(
+            Databases.calendars,
+            (league["leagueid"],),
+            season["season"]["league_season_id"],
+        ),
+    )
+
+    lap_files = bool(args.get("--lap-files"))
+    lap_format = _lap_format(args)
+    for race_obj in season_races:
+        _write_content(
+            args,
+            Databases.p_races,
+            (league["leagueid"], season["season"]["league_season_id"]),
+            race_obj.subsessionid,
+            _versioned(lap_format, season_obj.race_summary(
+                race_obj.subsessionid,
+                lap_files=lap_files,
+                lap_format=lap_format,
+            )),
+        )
+        if lap_files:
+            _write_lap_files(args, race_obj)
+
+    _write_content(
+        args,
+        Databases.p_seasons,
+        (league["leagueid"],),
+        season["season"]["league_season_id"],
+        season_obj.summary(),
+    )
+
+    return season_obj
+
+
+def _write_league(args: dict, league: dict, summaries: list) -> None:
+    """Write the league summary of its seasons' `league_summary`s."""
+
+    if summaries:
+        _write_content(
+            args,
+            Databases.p_leagues,
+            (),
+            league["leagueid"],
+            {
+                "league": League(league, []).info,
+                "seasons": summaries,
+            },
+        )
+
+
+def _write_top_level(args: dict, leagues: list) -> None:
+    """Write top level files.
+
+    The format file lets frontends negotiate the output format version,
+    its flags list the lap flag names by bit, for columnar lap flags.
+    """
+
+    args["stats"].add()
+    _write_content(
+        args,
+        Databases.p_leagues,
+        (),
+        "format",
+        {
+            "format": _lap_format(args),
+            "flags": [x.name for x in FLAGS],
+        },
+    )
 
     _write_content(
         args,
         Databases.p_leagues,
         (),
         "leagues",
-        [League(x, []).info for x in data["leagues"]],
+        [League(x, []).info for x in leagues],
     )
 
 
-def write_templates(args: dict, data: dict) -> None:
-    """Write the data-formatted templates to the output path."""
+def _league_members(leagues: list, stats: Stats) -> dict:
+    """Return all members of all leagues, by customer ID."""
+
+    members = {}
+    for league in leagues:
+        stats.add()
+        for member in Server.read_all(
+                Databases.members,
+                (league["leagueid"],)):
+            if member["custID"] not in members:
+                stats.add()
+                members[member["custID"]] = member
+    return members
+
+
+def write_templates(args: dict) -> None:
+    """Write the data-formatted templates to the output path.
+
+    Leagues are loaded and written one season at a time. Driver results
+    are spilled to the drivers database after each league, then the
+    driver files are written from there.
+    """
 
     stats = Stats()
     args["stats"] = stats
-    _write_top_level(args, data)
+    args["models"] = Registry()
+    output.open_manifest(args)
 
-    all_drivers = []
+    leagues = Server.read_all(Databases.leagues)
+    _write_top_level(args, leagues)
+    all_drivers = _league_members(leagues, stats)
+
+    # ensure the car catalog is available, only logs in if stale or missing
+    catalog.load()
+
+    for league in leagues:
+        seasons = Server.read_all(Databases.seasons, (league["leagueid"],))
+        stats.add(len(seasons))
+        log.info(
+            "Generating %d seasons for %s",
+            len(seasons),
+            league["leaguename"],
+        )
+
+        summaries = []
+        results = {}
+        for season in seasons:
+            season = _read_season(league["leagueid"], season)
+            season_obj = _write_season(args, season, league)
+            if season_obj:
+                summaries.append(season_obj.league_summary)
+            _add_results(results, _season_driver_results(
+                season,
+                league,
+                all_drivers,
+                args["models"],
+            ))
+            # nothing is shared between seasons, keep memory bounded
+            args["models"].clear()
+
+        _write_league(args, league, summaries)
+        _spill_driver_results(league["leagueid"], results)
+
+    _write_drivers(args, list(all_drivers.values()))
+    log.debug(
+        "Parsed model registry: %d hits, %d misses",
+        args["models"].hits,
+        args["models"].misses,
+    )
+    output.close_manifest(args)
+
+
+def _worker_args(args: dict) -> dict:
+    """Return the command line arguments to pass to a worker process."""
+
+    return {k: v for k, v in args.items() if k.startswith("--")}
+
+
+def _worker_setup(args: dict) -> dict:
+    """Return the worker's args, with fresh Stats and a shared Manifest."""
+
+    args = dict(args, stats=Stats(0), models=Registry())
+    output.worker_manifest(args)
+    return args
+
+
+# state shared by every job of a worker process, set by `_worker_init`
+_WORKER = {}
 
-    for league, _data in data["data"].items():
-        stats.add()
-        league_info = _league_info(data["leagues"], league)
 
-        if league_info:
-            stats.add(len(_data["seasons"]))
+def _worker_init(drivers: set, catalog_items: dict) -> None:
+    """Worker process initializer, receives the shared state once.
+
+    Args::
+
+        drivers: customer IDs of all league members
+        catalog_items: the parent's `catalog.snapshot`
+    """
+
+    _WORKER["drivers"] = drivers
+    catalog.install(catalog_items)
+
+
+def _season_job(args: dict, league: dict, season: dict) -> tuple:
+    """Worker process, load and write a single season.
+
+    Returns:
+        tuple of Stats, the season's league summary (or None), driver
+        results from `_season_driver_results` and manifest entries
+    """
+
+    args = _worker_setup(args)
+    season = _read_season(league["leagueid"], season)
+
+    season_obj = _write_season(args, season, league)
+    season_results = _season_driver_results(
+        season,
+        league,
+        _WORKER["drivers"],
+        args["models"],
+    )
+
+    return (
+        args["stats"],
+        season_obj.league_summary if season_obj else None,
+        season_results,
+        output.worker_written(args),
+    )
+
+
+def _drivers_job(args: dict, drivers: list) -> tuple:
+    """Worker process, write the results for a chunk of drivers.
+
+    Returns:
+        tuple of Stats and manifest entries
+    """
+
+    args = _worker_setup(args)
+    stats = args["stats"]
+    for driver in drivers:
+        try:
+            _write_driver(args, driver, stats)
+        except Exception as error:
+            stats.fail("driver {}".format(driver["custID"]), error)
+
+    return stats, output.worker_written(args)
+
+
+def write_templates_parallel(args: dict, jobs: int) -> None:
+    """Write the data-formatted templates using a pool of processes.
+
+    Seasons are loaded and written by the workers. The parent spills the
+    driver results after each league, then splits the drivers between
+    the workers.
+    """
+
+    stats = Stats()
+    args["stats"] = stats
+    output.open_manifest(args)
+
+    leagues = Server.read_all(Databases.leagues)
+    _write_top_level(args, leagues)
+    all_drivers = _league_members(leagues, stats)
+
+    # loaded once here, workers never read storage or login for it
+    catalog.load()
+
+    worker_args = _worker_args(args)
+
+    with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(set(all_drivers), catalog.snapshot())) as executor:
+
+        for league in leagues:
+            seasons = Server.read_all(
+                Databases.seasons,
+                (league["leagueid"],),
+            )
+            stats.add(len(seasons))
             log.info(
                 "Generating %d seasons for %s",
-                len(_data["seasons"]),
-                league_info["leaguename"],
+                len(seasons),
+                league["leaguename"],
             )
 
-            for member in _data["members"]:
-                found = False
-                for known in all_drivers:
-                    if known["custID"] == member["custID"]:
-                        found = True
-                        break
-                if not found:
-                    stats.add()
-                    all_drivers.append(member)
-
-            seasons = _write_seasons(args, _data["seasons"], league_info)
-            if seasons:
-                _write_content(
-                    args,
-                    Databases.p_leagues,
-                    (),
-                    league_info["leagueid"],
-                    League(league_info, seasons).summary,
-                )
-
-        else:
+            futures = [executor.submit(
+                _season_job,
+                worker_args,
+                league,
+                season,
+            ) for season in seasons]
+
+            summaries = []
+            results = {}
+            for season, future in zip(seasons, futures):
+                try:
+                    result = future.result()
+                except Exception as error:
+                    stats.fail("season {}".format(
+                        season["league_season_id"]
+                    ), error)
+                    continue
+
+                season_stats, summary, season_results, written = result
+                stats.consume(season_stats, queued=True)
+                output.record_written(args, written)
+                _add_results(results, season_results)
+                if summary:
+                    summaries.append(summary)
+
+            _write_league(args, league, summaries)
+            _spill_driver_results(league["leagueid"], results)
+
+        drivers = list(all_drivers.values())
+        size = max(1, len(drivers) // (jobs * 4))
+        futures = [executor.submit(
+            _drivers_job,
+            worker_args,
+            drivers[i:i + size],
+        ) for i in range(0, len(drivers), size)]
+
+        for future in futures:
             try:
-                os.remove(os.path.join(
-                    args["--output"],
-                    "{}.json".format(league),
-                ))
+                driver_stats, written = future.result()
             except Exception as error:
-                log.warning("Failed to remove league json: %r", error)
+                stats.fail("driver chunk", error)
+                continue
+            stats.consume(driver_stats)
+            output.record_written(args, written)
+
+    output.close_manifest(args)
 
-            try:
-                shutil.rmtree(os.path.join(args["--output"], str(league)))
-            except Exception as error:
-                log.warning("Failed to remove league files: %r", error)
 
-    _write_drivers(args, data, all_drivers)
+def _profile_phases() -> dict:
+    """Return the functions of each phase, for `profiler.profiled`."""
+
+    module = sys.modules[__name__]
+    return {
+        "load": (
+            (Server, "read"),
+            (Server, "read_all"),
+            (module, "_league_members"),
+            (module, "_read_season"),
+            (module, "driver_results"),
+        ),
+        "seasons": (
+            (module, "_write_season"),
+            (module, "_write_league"),
+            (module, "_write_top_level"),
+        ),
+        "races": (
+            (Registry, "race"),
+            (Season, "race_summary"),
+            (module, "_write_lap_files"),
+        ),
+        "drivers": (
+            (module, "_season_driver_results"),
+            (module, "_spill_driver_results"),
+            (module, "_write_driver"),
+        ),
+        "writes": (
+            (module, "_write_content"),
+        ),
+    }
 
 
 def main():
@@ -505,7 +884,37 @@ def main():
     # in case we need to fallback to file storage
     os.environ["IRACE_RESULTS"] = args["--input"]
 
-    write_templates(args, _read_json())
+    try:
+        jobs = int(args["--jobs"])
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise SystemExit("--jobs must be a positive integer")
+
+    try:
+        args["--format"] = int(args["--format"])
+    except ValueError:
+        args["--format"] = 0
+    if args["--format"] not in LAP_FORMATS:
+        raise SystemExit("--format must be one of: {}".format(
+            ", ".join(str(x) for x in LAP_FORMATS)
+        ))
+
+    if jobs > 1 and args["--profile"]:
+        log.warning("Only the parent process is profiled with --jobs")
+
+    with profiled(args["--profile"], _profile_phases()):
+        if jobs > 1:
+            write_templates_parallel(args, jobs)
+        else:
+            write_templates(args)
+
+    failures = args["stats"].report()
+    if failures:
+        raise SystemExit("Failed to process {:,d} item{}".format(
+            failures,
+            "s" * int(failures != 1),
+        ))
 
 
 if __name__ == "__main__":
@@ -17,6 +17,7 @@ Options:
 import json
 
 from .stats import Client
+from .stats.constants import Priority
 from .utils import get_args
 from .utils import config_client
 
@@ -27,10 +28,11 @@ def main():
     args = get_args(__doc__)
     config_client(args)
 
-    try:
-        res = Client.league_info(int(args["<SEARCH>"]))
-    except ValueError:
-        res = Client.league_search(args["<SEARCH>"])
+    with Client.priority(Priority.INTERACTIVE):
+        try:
+            res = Client.league_info(int(args["<SEARCH>"]))
+        except ValueError:
+            res = Client.league_search(args["<SEARCH>"])
 
     print(json.dumps(res, sort_keys=True, indent=4, ensure_ascii=False))
 
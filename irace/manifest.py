@@ -0,0 +1,280 @@
+"""Content hash manifest of a generated output directory.
+
+The manifest records a hash of every file written to the output path, so
+unchanged files can be skipped without reading them back, and files that
+are no longer produced can be pruned.
+"""
+
+
+import io
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+import threading
+
+from .stats.logger import log
+
+
+FILENAME = ".manifest.json"
+VERSION = 1
+
+
+def atomic_write(path: str, content: bytes) -> None:
+    """Write the content to path via a temporary file and rename."""
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    handle, temp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as open_file:
+            open_file.write(content)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+
+
+class _HashingWriter:
+    """Buffered writer to a temporary file (and gzip), hashing as it goes.
+
+    Content smaller than the buffer never touches the disk unless it is
+    committed. Use as a context manager, temporary files are removed
+    unless `commit` moved them into place.
+    """
+
+    buffer_size = 65536
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+        self._hash = hashlib.sha1()
+        self._buffer = []
+        self._buffered = 0
+        self._pending = b""
+        self._temps = []
+        self._gzip = None
+
+    def _open(self) -> None:
+        """Open the temporary file(s) beside our path."""
+
+        for _ in range(1 + int(self.compress)):
+            handle, temp = tempfile.mkstemp(
+                dir=os.path.dirname(self.path),
+                prefix=".",
+                suffix=".tmp",
+            )
+            self._temps.append((os.fdopen(handle, "wb"), temp))
+
+        if self.compress:
+            self._gzip = gzip.GzipFile(
+                fileobj=self._temps[1][0],
+                mode="wb",
+                compresslevel=9,
+                mtime=0,
+            )
+
+    def _write(self, encoded: bytes) -> None:
+        """Write the encoded bytes to the temporary file(s)."""
+
+        if not self._temps:
+            self._open()
+        self._temps[0][0].write(encoded)
+        if self._gzip:
+            self._gzip.write(encoded)
+
+    def _encode(self) -> bytes:
+        """Return the buffered chunks encoded and hashed."""
+
+        encoded = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        self._buffered = 0
+        self._hash.update(encoded)
+        return encoded
+
+    def write(self, chunk: str) -> None:
+        """Buffer the string chunk, writing out when the buffer is full."""
+
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            self._write(self._encode())
+
+    def hexdigest(self) -> str:
+        """Return the hash of the content, call once all is written."""
+
+        self._pending += self._encode()
+        return self._hash.hexdigest()
+
+    def commit(self) -> None:
+        """Write anything pending and move the file(s) into place."""
+
+        self._write(self._pending)
+        self._pending = b""
+
+        if self._gzip:
+            self._gzip.close()
+        for (open_file, temp), target in zip(
+                self._temps,
+                (self.path, self.path + ".gz")):
+            open_file.close()
+            os.chmod(temp, 0o644)
+            os.replace(temp, target)
+        self._temps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        if self._gzip:
+            self._gzip.close()
+        for open_file, temp in self._temps:
+            open_file.close()
+            _remove(temp)
+
+
+def _remove(path: str) -> None:
+    """Remove the file at path, if it exists."""
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Manifest:
+    """Tracks the files written below the root output path.
+
+    Thread safe, worker processes can hand their written entries to the
+    parent with `take_written` and `record`.
+    """
+
+    def __init__(self, root: str, compress: bool = False):
+        self.root = root
+        self.compress = bool(compress)
+        self._lock = threading.Lock()
+        self._previous = {}
+        self._files = {}
+        self._written = {}
+
+        path = os.path.join(root, FILENAME)
+        try:
+            with io.open(path, "r", encoding="utf-8") as open_file:
+                manifest = json.load(open_file)
+        except FileNotFoundError:
+            return
+        except Exception as error:
+            log.warning("Ignoring unreadable manifest %s: %r", path, error)
+            return
+
+        # a change in format or compression means everything is rewritten
+        if manifest.get("version") == VERSION and \
+                manifest.get("gzip") == self.compress:
+            self._previous = manifest.get("files") or {}
+        else:
+            self._previous = dict.fromkeys(manifest.get("files") or {}, "")
+
+    def write(self, relpath: str, content: str) -> bool:
+        """Write the content to the path relative to root, if changed.
+
+        Returns:
+            boolean of if the file was written
+        """
+
+        return self.write_chunks(relpath, (content,))
+
+    def write_chunks(self, relpath: str, chunks) -> bool:
+        """Stream string chunks to the path relative to root, if changed.
+
+        The content is hashed while it is written to a temporary file, which
+        replaces the file only if the hash differs from the previous run.
+        Content smaller than the buffer is kept in memory instead.
+
+        Returns:
+            boolean of if the file was written
+        """
+
+        path = os.path.join(self.root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with _HashingWriter(path, self.compress) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+
+            content_hash = writer.hexdigest()
+            with self._lock:
+                unchanged = self._previous.get(relpath) == content_hash
+                self._files[relpath] = content_hash
+                self._written[relpath] = content_hash
+
+            if unchanged and os.path.isfile(path) and (
+                    not self.compress or os.path.isfile(path + ".gz")):
+                return False
+
+            writer.commit()
+
+        if not self.compress:
+            _remove(path + ".gz")
+
+        return True
+
+    def take_written(self) -> dict:
+        """Return and forget the entries written since the last call."""
+
+        with self._lock:
+            written = self._written
+            self._written = {}
+        return written
+
+    def record(self, entries: dict) -> None:
+        """Record entries written elsewhere, from `take_written`."""
+
+        with self._lock:
+            self._files.update(entries)
+
+    def prune(self) -> int:
+        """Remove files from previous runs which were not written in this.
+
+        Returns:
+            integer count of files removed
+        """
+
+        with self._lock:
+            stale = [x for x in self._previous if x not in self._files]
+            self._previous = {}
+
+        for relpath in stale:
+            path = os.path.join(self.root, relpath)
+            _remove(path)
+            _remove(path + ".gz")
+            log.log(5, "Pruned: %s", path)
+
+            # remove any now empty directories, up to the root
+            directory = os.path.dirname(path)
+            while os.path.abspath(directory) != os.path.abspath(self.root):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+
+        return len(stale)
+
+    def save(self) -> None:
+        """Write the manifest, keeping any entries not yet pruned."""
+
+        with self._lock:
+            files = dict(self._previous)
+            files.update(self._files)
+
+        atomic_write(os.path.join(self.root, FILENAME), json.dumps(
+            {"version": VERSION, "gzip": self.compress, "files": files},
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8"))
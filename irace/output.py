@@ -0,0 +1,181 @@
+"""Writing generated JSON to the output directory.
+
+Content is streamed through the output directory's `Manifest`, so files
+are only rewritten when their content changes.
+"""
+
+
+import os
+import json
+from json.encoder import encode_basestring
+
+from .manifest import Manifest
+from .stats.logger import log
+
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# target size of the chunks of encoded JSON, the manifest's write buffer
+CHUNK_SIZE = 65536
+
+# manifests loaded by this (worker) process, by output path and gzip flag
+_MANIFESTS = {}
+
+
+def make_missing(path: str) -> None:
+    """Creates the directory at path if missing."""
+
+    try:
+        os.makedirs(path, exist_ok=True)
+    except FileExistsError:
+        raise SystemExit(
+            "Output directory exists as a file, aborting."
+        ) from None
+
+
+def _estimate(content: object) -> int:
+    """Estimate the encoded size of content, sampling the first list item."""
+
+    if isinstance(content, dict):
+        return 2 + sum(
+            len(str(key)) + 4 + _estimate(value)
+            for key, value in content.items()
+        )
+    if isinstance(content, (list, tuple)):
+        if not content:
+            return 2
+        return 2 + len(content) * (1 + _estimate(content[0]))
+    if isinstance(content, str):
+        return len(content) + 2
+    return 8
+
+
+def iter_json(content: object, chunk_size: int = CHUNK_SIZE):
+    """Yield the JSON encoding of content in chunks.
+
+    Content estimated to fit in chunk_size is encoded in one go by the C
+    encoder. Larger dictionaries are streamed value by value, larger lists
+    in runs of items which fit, so chunks stay around chunk_size however
+    the content is nested. The output is identical to `json.dumps` with
+    the same options.
+    """
+
+    if _estimate(content) <= chunk_size:
+        yield _ENCODER.encode(content)
+
+    elif isinstance(content, dict) and all(
+            isinstance(x, str) for x in content):
+        prefix = "{"
+        for key, value in content.items():
+            yield prefix + encode_basestring(key) + ":"
+            yield from iter_json(value, chunk_size)
+            prefix = ","
+        yield "}"
+
+    elif isinstance(content, (list, tuple)):
+        yield from _iter_list(content, chunk_size)
+
+    else:
+        yield _ENCODER.encode(content)
+
+
+def _iter_list(content: list, chunk_size: int):
+    """Yield the JSON of a list too large for one chunk, see `iter_json`."""
+
+    prefix = "["
+    run = []
+    size = 0
+    for value in content:
+        estimate = _estimate(value) + 1
+        if run and size + estimate > chunk_size:
+            yield prefix + _ENCODER.encode(run)[1:-1]
+            prefix = ","
+            run = []
+            size = 0
+
+        if estimate > chunk_size:
+            yield prefix
+            yield from iter_json(value, chunk_size)
+            prefix = ","
+        else:
+            run.append(value)
+            size += estimate
+
+    if run:
+        yield prefix + _ENCODER.encode(run)[1:-1]
+    yield "]"
+
+
+def write_json(manifest: Manifest, content: object, path: str) -> bool:
+    """Stream the JSON of content to path, if changed.
+
+    Args::
+
+        manifest: Manifest of the output directory
+        content: object to write
+        path: file path relative to the output directory
+
+    Returns:
+        boolean of if the file was written
+    """
+
+    if manifest.write_chunks(path, iter_json(content)):
+        log.log(5, "Wrote: %s", path)
+        return True
+
+    log.log(5, "Identical content, ignoring: %s", path)
+    return False
+
+
+def open_manifest(args: dict) -> None:
+    """Load the manifest of the output directory into args."""
+
+    if args.get("--output"):
+        make_missing(args["--output"])
+        args["manifest"] = Manifest(args["--output"], args.get("--gzip"))
+
+
+def close_manifest(args: dict) -> None:
+    """Prune stale output files, unless anything failed, and save."""
+
+    manifest = args.get("manifest")
+    if not manifest:
+        return
+
+    if args["stats"].failures:
+        log.warning("Not pruning stale output files after failures")
+    else:
+        pruned = manifest.prune()
+        if pruned:
+            log.info("Pruned %d stale output files", pruned)
+
+    manifest.save()
+
+
+def worker_manifest(args: dict) -> None:
+    """Share one Manifest between the jobs of a worker process.
+
+    The manifest is loaded once per worker process, entries written by
+    each job are returned to the parent with `worker_written`.
+    """
+
+    if args.get("--output"):
+        key = (args["--output"], bool(args.get("--gzip")))
+        if key not in _MANIFESTS:
+            _MANIFESTS[key] = Manifest(*key)
+        args["manifest"] = _MANIFESTS[key]
+
+
+def worker_written(args: dict) -> dict:
+    """Return the manifest entries written by this worker job."""
+
+    if args.get("manifest"):
+        return args["manifest"].take_written()
+    return {}
+
+
+def record_written(args: dict, written: dict) -> None:
+    """Record manifest entries returned from a worker job."""
+
+    if args.get("manifest"):
+        args["manifest"].record(written)
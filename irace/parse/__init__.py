@@ -5,3 +5,4 @@ from .laps import Laps  # noqa: F401
 from .race import Race  # noqa: F401
 from .season import Season  # noqa: F401
 from .league import League  # noqa: F401
+from .registry import Registry  # noqa: F401
@@ -1,10 +1,13 @@
 """Lap data parsing utilities."""
 
 
+import threading
+from array import array
 from collections import namedtuple
 
 from .utils import time_string
 from .utils import as_timedelta
+from .utils import time_string_raw
 
 
 Flag = namedtuple("Flag", ("name", "mask"))
@@ -23,6 +26,9 @@ FLAGS = (
     Flag("tow", 2048),
 )
 
+# output format version of lap lists, see `Laps.lap_list`
+LAP_FORMATS = (1, 2)
+
 
 def _get_flags(flags: int) -> tuple:
     """Return a tuple of applicable `Flag`s."""
@@ -35,47 +41,117 @@ def _get_flags(flags: int) -> tuple:
     return tuple(flag_objs)
 
 
+# (flags, flag names) of every combination of known flags, by mask
+ALL_FLAGS = sum(x.mask for x in FLAGS)
+_FLAG_TABLE = tuple(
+    (flags, tuple(x.name for x in flags)) for flags in
+    (_get_flags(mask) for mask in range(ALL_FLAGS + 1))
+)
+
+
 class Lap:
     """Parsed lap object."""
 
+    __slots__ = ("flags", "flag_names", "mask", "lap", "time_int", "time")
+
     def __init__(self, data: dict, prev: int):
-        self.flags = _get_flags(data["flags"])
-        self.flag_names = tuple([x.name for x in self.flags])
-        self.lap = data["lap_num"]
-        self.time_int = data["ses_time"] - prev
-        self.time = as_timedelta(self.time_int)
+        self._set(data["lap_num"], data["ses_time"] - prev, data["flags"])
+
+    @classmethod
+    def from_values(cls, lap: int, time_int: int, mask: int):
+        """Return a Lap from its number, time and flags mask."""
+
+        obj = cls.__new__(cls)
+        obj._set(lap, time_int, mask)  # pylint: disable=protected-access
+        return obj
+
+    def _set(self, lap: int, time_int: int, mask: int) -> None:
+        """Set our attributes from the lap number, time and flags."""
+
+        self.mask = mask & ALL_FLAGS
+        self.flags, self.flag_names = _FLAG_TABLE[self.mask]
+        self.lap = lap
+        self.time_int = time_int
+        self.time = as_timedelta(time_int)
 
     @property
     def summary(self) -> dict:
         """Return a summary of this lap."""
 
-        _summary = {
-            "lap": self.lap,
-            "time": "--:--" if self.lap == 0 else time_string(self.time),
-            "time_int": self.time_int,
-        }
-        if self.flags:
-            _summary["flags"] = self.flag_names
-        return _summary
+        return _lap_summary(self.lap, self.time_int, self.mask)
+
+
+def _lap_summary(lap: int, time_int: int, mask: int) -> dict:
+    """Return the summary of a lap, see `Lap.summary`."""
+
+    _summary = {
+        "lap": lap,
+        "time": "--:--" if lap == 0 else time_string_raw(time_int),
+        "time_int": time_int,
+    }
+    if mask:
+        _summary["flags"] = _FLAG_TABLE[mask][1]
+    return _summary
+
+
+_PARSE_LOCK = threading.Lock()
+
+
+def _parse_lap_data(lap_data: list) -> (array, array, array):
+    """Return the lap number, time and flag mask arrays of the lapData."""
+
+    lap_nums = array("q")
+    times = array("q")
+    masks = array("H")
+    prev = 0
+    for lap in lap_data:
+        lap_nums.append(lap["lap_num"])
+        times.append(lap["ses_time"] - prev)
+        masks.append(lap["flags"] & ALL_FLAGS)
+        prev = lap["ses_time"]
+    return lap_nums, times, masks
 
 
 class Laps:
     """Parsed laps object.
 
     Instatiate with the loaded JSON return from `stats.Client.session_laps`.
+
+    The lapData is parsed when a per lap property is first used, into
+    arrays of lap numbers, times and flag masks. `Lap` objects are only
+    built if `laps` is used, and the lap aggregates are calculated in a
+    single pass when first needed.
     """
 
     def __init__(self, data: dict):
         self.drivers = data["drivers"]
         self.race = data["header"]
 
-        laps = []
-        prev = 0
-        for lap in data["lapData"]:
-            laps.append(Lap(lap, prev))
-            prev = lap["ses_time"]
+        self._lap_data = data["lapData"]
+        self._arrays = None
+        self._laps = None
+        self._totals = None
+
+    def _lap_arrays(self) -> (array, array, array):
+        """Return the lap number, time and flag mask arrays."""
+
+        arrays = self._arrays
+        if arrays is None:
+            with _PARSE_LOCK:  # Laps are shared between driver threads
+                if self._arrays is None:
+                    self._arrays = _parse_lap_data(self._lap_data)
+                    self._lap_data = None
+                arrays = self._arrays
 
-        self.laps = tuple(laps)
+        return arrays
+
+    @property
+    def laps(self) -> tuple:
+        """Tuple of `Lap` objects."""
+
+        if self._laps is None:
+            self._laps = tuple(map(Lap.from_values, *self._lap_arrays()))
+        return self._laps
 
     @property
     def average(self) -> float:
@@ -84,7 +160,7 @@ class Laps:
         If the return is < 0, there is no average time.
         """
 
-        total_lap_time, valid_laps = self._lap_totals()
+        total_lap_time, valid_laps, _ = self._lap_totals()
 
         if valid_laps:  # avoid divide by zero
             return total_lap_time / valid_laps
@@ -142,7 +218,7 @@ class Laps:
     def total_time(self) -> float:
         """Total lap time of all laps."""
 
-        return sum(x.time.total_seconds() for x in self.laps)
+        return self._lap_totals()[2]
 
     @property
     def total_time_string(self) -> str:
@@ -172,37 +248,42 @@ class Laps:
     def total_laps(self) -> int:
         """Number of totals laps turned."""
 
-        return len(self.laps)
+        # the arrays are set before the lap data is freed
+        arrays = self._arrays
+        if arrays is None:
+            lap_data = self._lap_data
+            if lap_data is not None:
+                return len(lap_data)
+            arrays = self._arrays
+        return len(arrays[1])
 
     @property
     def flagged_laps(self) -> dict:
         """Returns a dictionary of lap number to flag (by name)."""
 
-        incidents = {}
-        for lap in self.laps:
-            if lap.flags:
-                incidents[lap.lap] = tuple(x.name for x in lap.flags)
-        return incidents
+        lap_nums, _, masks = self._lap_arrays()
+        return {
+            lap: _FLAG_TABLE[mask][1] for lap, mask in
+            zip(lap_nums, masks) if mask
+        }
 
-    def _lap_totals(self) -> (float, int):
-        """Sum the total lap time and count of valid laps."""
+    def _lap_totals(self) -> (float, int, float):
+        """Sum the valid lap time, count of valid laps and total time."""
 
-        total_lap_time = 0.0
-        valid_laps = 0
-        for lap in self.laps:
-            if lap.lap == 0:
-                continue
-            lap_is_valid = True
-            for flag in lap.flags:
-                if flag.mask == 1:  # invalid lap
-                    lap_is_valid = False
-                    break
+        if self._totals is None:
+            total_lap_time = 0.0
+            valid_laps = 0
+            total_time = 0
+            for lap, time_int, mask in zip(*self._lap_arrays()):
+                seconds = time_int / 10000.0
+                total_time += seconds
+                if lap != 0 and not mask & 1:  # 1 is an invalid lap
+                    valid_laps += 1
+                    total_lap_time += seconds
 
-            if lap_is_valid:
-                valid_laps += 1
-                total_lap_time += lap.time.total_seconds()
+            self._totals = (total_lap_time, valid_laps, total_time)
 
-        return total_lap_time, valid_laps
+        return self._totals
 
     @property
     def fastest_driver(self) -> str:
@@ -242,13 +323,46 @@ class Laps:
         return 0
 
     @property
-    def summary(self) -> dict:
-        """Returns a summary of the laps driven."""
+    def statistics(self) -> dict:
+        """Returns the lap statistics, without the laps themselves."""
 
+        lap_nums = self._lap_arrays()[0]
         return {
-            "num_laps": max(x.lap for x in self.laps) if self.laps else 0,
+            "num_laps": max(lap_nums) if lap_nums else 0,
             "average_lap": self.average_string,
             "fastest_lap": self.fastest_lap_string,
             "fast_lap": self.fast_lap,
-            "laps": [lap.summary for lap in self.laps],
         }
+
+    def lap_list(self, lap_format: int = 1):
+        """Returns the laps driven in the output format version.
+
+        Format 1 is a list of `Lap.summary` dictionaries. Format 2 is a
+        dictionary of parallel lists, "lap" numbers, "time" integers each
+        as the difference from the previous lap's time, and "flags" as
+        bitmasks of `FLAGS`.
+        """
+
+        lap_nums, lap_times, masks = self._lap_arrays()
+        if lap_format < 2:
+            return list(map(_lap_summary, lap_nums, lap_times, masks))
+
+        times = []
+        prev = 0
+        for time_int in lap_times:
+            times.append(time_int - prev)
+            prev = time_int
+
+        return {
+            "lap": lap_nums.tolist(),
+            "time": times,
+            "flags": masks.tolist(),
+        }
+
+    @property
+    def summary(self) -> dict:
+        """Returns a summary of the laps driven."""
+
+        _summary = self.statistics
+        _summary["laps"] = self.lap_list()
+        return _summary
@@ -5,7 +5,7 @@ from datetime import datetime
 from collections import namedtuple
 
 from .utils import time_string_raw
-from ..stats import Client
+from .. import catalog
 
 
 Driver = namedtuple("Driver", ("name", "id"))
@@ -26,17 +26,32 @@ class Race:  # pylint: disable=too-many-instance-attributes
             key=lambda x: x["finishpos"],
         )
 
-        classes = []  # NB: specifically not using set comp to keep order
-        class_winners = []
+        # single pass for the per-class aggregates, dicts keep class order
+        class_winners = {}
+        self._class_laps = {}
+        self._class_drivers = {}
+        self._results = {}  # custid: first (best) result
         for res in self.results:
-            if res["ccNameShort"] not in classes:
-                classes.append(res["ccNameShort"])
-                class_winners.append({
+            cls = res["ccNameShort"]
+            if cls not in class_winners:
+                class_winners[cls] = {
                     "id": res["custid"],
                     "name": res["displayname"]
-                })
-        self.classes = tuple(classes)
-        self.class_winners = tuple(class_winners)
+                }
+                self._class_laps[cls] = res["lapscomplete"]
+                self._class_drivers[cls] = 0
+            self._class_laps[cls] = max(
+                self._class_laps[cls],
+                res["lapscomplete"],
+            )
+            self._class_drivers[cls] += 1
+            self._results.setdefault(res["custid"], res)
+        self.classes = tuple(class_winners)
+        self.class_winners = tuple(class_winners.values())
+
+        self._laps = {}  # custid: first Laps
+        for laps_obj in self.laps:
+            self._laps.setdefault(laps_obj.driver_id, laps_obj)
 
         date = datetime.strptime(race["start_time"], "%Y-%m-%d %H:%M:%S")
         self.race_time = "{}Z".format(date.isoformat())
@@ -49,6 +64,7 @@ class Race:  # pylint: disable=too-many-instance-attributes
             self.winner_id = 0
 
         self.subsessionid = race["subsessionid"]
+        self._summaries = {}
 
     @property
     def multiclass(self) -> bool:
@@ -60,22 +76,13 @@ class Race:  # pylint: disable=too-many-instance-attributes
     def class_laps_completed(self) -> dict:
         """Mapping of string class to integer laps completed."""
 
-        return {
-            cls: max(
-                x["lapscomplete"]
-                for x in self.results if x["ccNameShort"] == cls
-            ) for cls in self.classes
-        }
+        return self._class_laps
 
     @property
     def class_drivers(self) -> dict:
         """Mapping of string class to integer count of drivers."""
 
-        return {
-            cls: len([
-                x for x in self.results if x["ccNameShort"] == cls
-            ]) for cls in self.classes
-        }
+        return self._class_drivers
 
     def class_summary(self, include_winners: bool = False) -> list:
         """Return a per-class summary of this race."""
@@ -113,99 +120,151 @@ class Race:  # pylint: disable=too-many-instance-attributes
     def _driver_results(self, driver_id: int) -> dict:
         """Return the results dict for the driver by ID."""
 
-        for res in self.results:
-            if res["custid"] == driver_id:
-                return res
-        return {}
+        return self._results.get(driver_id, {})
 
     def driver_summary(self, driver_id: int,
                        race_info: bool = True,
                        driver_info: bool = False,
-                       lap_info: bool = True) -> dict:
-        """Returns a race summary including the laps summary."""
+                       lap_info: bool = True,
+                       lap_list: bool = True,
+                       lap_format: int = 1) -> dict:
+        """Returns a race summary including the laps summary.
+
+        With lap_list False, only the lap statistics are included, see
+        `lap_summary` for the laps themselves. Laps are listed in the
+        lap_format version, see `Laps.lap_list`.
+
+        Summaries are memoized, treat the returned dictionary as read-only.
+        """
+
+        # pylint: disable=too-many-arguments
+        key = (
+            driver_id,
+            race_info,
+            driver_info,
+            lap_info,
+            lap_list,
+            lap_format,
+        )
+        if key not in self._summaries:
+            self._summaries[key] = self._driver_summary(*key)
+        return self._summaries[key]
 
-        _summary = {}
+    def _driver_summary(self, driver_id: int, race_info: bool,
+                        driver_info: bool, lap_info: bool,
+                        lap_list: bool, lap_format: int) -> dict:
+        """Build the driver summary, see `driver_summary`."""
 
-        for laps in self.laps:
-            if laps.driver_id == driver_id:
-                if lap_info:
-                    _summary.update(laps.summary)
-                else:
-                    _summary["laps"] = laps.total_laps
-
-                res = self._driver_results(driver_id)
-                if res:
-                    _summary.update({
-                        "incidents": res["incidents"],
-                        "start": res["startpos"] + 1,
-                        "finish": res["finishpos"] + 1,
-                        "points": res["league_points"],
-                        "out": res["reasonout"],
-                        "interval": "--:--" if
-                                    self.race["eventlapscomplete"] == 0 else
-                                    time_string_raw(res["interval"]) if (
-                                        res["interval"] > 0 or
-                                        res["finishpos"] == 0
-                                    ) else "{:,d}L".format(
-                                        res["lapscomplete"] -
-                                        self.race["eventlapscomplete"]
-                                    ),
-                        "interval_raw": res["interval"],
-                        "car": Client.cache["cars"].get(
-                            res["carid"],
-                            {"abbrevname": "N/A"}
-                        )["abbrevname"],
-                        "car_id": res["carid"],
-                    })
+        # pylint: disable=too-many-arguments
+        laps = self._laps.get(driver_id)
+        if laps is None:
+            return {}
 
-                    if self.multiclass:
-                        _summary["class"] = {
-                            "name": res["ccNameShort"],
-                            "finish": res["finishposinclass"] + 1,
-                            "interval": time_string_raw(
-                                res["classinterval"]
-                            ) if (
-                                res["classinterval"] > 0 or
-                                res["finishposinclass"] == 0
+        _summary = {}
+        if lap_info:
+            _summary.update(laps.statistics)
+            if lap_list:
+                _summary["laps"] = laps.lap_list(lap_format)
+        else:
+            _summary["laps"] = laps.total_laps
+
+        res = self._driver_results(driver_id)
+        if res:
+            _summary.update({
+                "incidents": res["incidents"],
+                "start": res["startpos"] + 1,
+                "finish": res["finishpos"] + 1,
+                "points": res["league_points"],
+                "out": res["reasonout"],
+                "interval": "--:--" if
+                            self.race["eventlapscomplete"] == 0 else
+                            time_string_raw(res["interval"]) if (
+                                res["interval"] > 0 or
+                                res["finishpos"] == 0
                             ) else "{:,d}L".format(
                                 res["lapscomplete"] -
-                                self.class_laps_completed[res["ccNameShort"]]
+                                self.race["eventlapscomplete"]
                             ),
-                            "interval_raw": res["classinterval"],
-                        }
-
-                    if race_info:
-                        _summary.update({
-                            "league": self.race["leagueid"],
-                            "season": self.race["league_season_id"],
-                            "id": self.race["subsessionid"],
-                            "time": self.race_time,
-                            "drivers": len(self.results),
-                            "track": self.race["track_name"],
-                            "config": self.race["track_config_name"],
-                            "sof": self.race["eventstrengthoffield"],
-                        })
-
-                        if self.multiclass:
-                            _summary["class"].update({
-                                "laps": self.class_laps_completed[
-                                    res["ccNameShort"]
-                                ],
-                                "drivers": self.class_drivers[
-                                    res["ccNameShort"]
-                                ],
-                            })
-
-                    if driver_info:
-                        _summary.update({
-                            "driver": {
-                                "id": res["custid"],
-                                "name": res["displayname"],
-                            },
-                            "car_num": res["carnum"],
-                            "club": res["clubshortname"],
-                        })
-
-                break
+                "interval_raw": res["interval"],
+                "car": catalog.get("cars").get(
+                    res["carid"],
+                    {"abbrevname": "N/A"}
+                )["abbrevname"],
+                "car_id": res["carid"],
+            })
+
+            if self.multiclass:
+                _summary["class"] = {
+                    "name": res["ccNameShort"],
+                    "finish": res["finishposinclass"] + 1,
+                    "interval": time_string_raw(
+                        res["classinterval"]
+                    ) if (
+                        res["classinterval"] > 0 or
+                        res["finishposinclass"] == 0
+                    ) else "{:,d}L".format(
+                        res["lapscomplete"] -
+                        self.class_laps_completed[res["ccNameShort"]]
+                    ),
+                    "interval_raw": res["classinterval"],
+                }
+
+            if race_info:
+                _summary.update({
+                    "league": self.race["leagueid"],
+                    "season": self.race["league_season_id"],
+                    "id": self.race["subsessionid"],
+                    "time": self.race_time,
+                    "drivers": len(self.results),
+                    "track": self.race["track_name"],
+                    "config": self.race["track_config_name"],
+                    "sof": self.race["eventstrengthoffield"],
+                })
+
+                if self.multiclass:
+                    _summary["class"].update({
+                        "laps": self.class_laps_completed[
+                            res["ccNameShort"]
+                        ],
+                        "drivers": self.class_drivers[
+                            res["ccNameShort"]
+                        ],
+                    })
+
+            if driver_info:
+                _summary.update({
+                    "driver": {
+                        "id": res["custid"],
+                        "name": res["displayname"],
+                    },
+                    "car_num": res["carnum"],
+                    "club": res["clubshortname"],
+                })
 
         return _summary
+
+    def lap_summary(self, driver_id: int, lap_format: int = 1) -> dict:
+        """Returns the laps driven by the driver, for a separate lap file."""
+
+        laps = self._laps.get(driver_id)
+        if laps is None:
+            return {}
+
+        return {
+            "id": self.subsessionid,
+            "driver_id": driver_id,
+            "laps": laps.lap_list(lap_format),
+        }
+
+    def lap_file(self, driver_id: int) -> str:
+        """Returns the path of the driver's lap file, relative to output.
+
+        Matches the layout of `storage.Databases.p_laps`.
+        """
+
+        return "{}/{}/{}/{}.json".format(
+            self.race["leagueid"],
+            self.race["league_season_id"],
+            self.subsessionid,
+            driver_id,
+        )
@@ -0,0 +1,62 @@
+"""Registry of parsed models, shared between generate phases.
+
+Note the following environment variables are used:
+
+    IRACE_CACHE_RACES      races to keep parsed [default: 10000]
+"""
+
+
+import os
+import threading
+from collections import OrderedDict
+
+from .race import Race
+
+
+class Registry:
+    """Bounded, least recently used cache of Race objects.
+
+    Races are keyed by subsessionid, Laps objects are held by their Race.
+    Seasons are not cached, the season pages only include races with a
+    winner while driver results count every race of the season.
+    """
+
+    def __init__(self, max_races: int = None):
+        self.max_races = max_races or int(
+            os.getenv("IRACE_CACHE_RACES") or 10000
+        )
+        self._races = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def race(self, race: dict) -> Race:
+        """Return the Race for a dictionary of race and laps."""
+
+        key = race["race"]["subsessionid"]
+        with self._lock:
+            if key in self._races:
+                self.hits += 1
+                self._races.move_to_end(key)
+                return self._races[key]
+
+        race_obj = Race(**race)
+
+        with self._lock:
+            if key in self._races:  # built concurrently, keep the first one
+                return self._races[key]
+            self.misses += 1
+            self._races[key] = race_obj
+            while len(self._races) > self.max_races:
+                self._races.popitem(last=False)
+
+        return race_obj
+
+    def clear(self) -> None:
+        """Free all cached objects."""
+
+        with self._lock:
+            self._races.clear()
+
+    def __len__(self) -> int:
+        return len(self._races)
@@ -15,18 +15,50 @@ class Season:
 
     def __init__(self, races: list, season: dict, league: dict,
                  calendar: dict = None):
-        self.races = races
-        self.race_data = [x.race for x in self.races]
+        self.races = []
+        self.race_data = []
         self.season = season
         self.league = league
         self.leaderboard = Leaderboard()
         self.calendar = calendar or {}
-        for race in self.races:
-            self.leaderboard.add(race)
+        self._races = {}  # subsessionid: Race
+        self._standings = None
+        self._drivers = {}  # custid: Driver, from standings
+        self._summaries = {}
+        for race in races:
+            self.add(race)
+
+    def add(self, race) -> None:
+        """Add a Race to this season."""
+
+        self.leaderboard.add(race)
+        self.races.append(race)
+        self.race_data.append(race.race)
+        self._races[race.subsessionid] = race
+
+        self._standings = None
+        self._drivers = {}
+        self._summaries = {}
 
     @property
     def standings(self) -> list:
-        """Return a list of driver standings for the season."""
+        """Return a list of driver standings for the season.
+
+        The standings are cached until a race is added.
+        """
+
+        self._index_standings()
+        return self._standings
+
+    def _index_standings(self) -> None:
+        """Sort and index the standings by customer ID, if required."""
+
+        if self._standings is None:
+            self._standings = self._sorted_standings()
+            self._drivers = {x.driver_id: x for x in self._standings}
+
+    def _sorted_standings(self) -> list:
+        """Return the leaderboard standings with positions set."""
 
         drivers = self.leaderboard.standings
 
@@ -43,102 +75,156 @@ class Season:
 
         return drivers
 
+    def _standing(self, driver_id: int):
+        """Return the Driver standing by customer ID, None if not found."""
+
+        self._index_standings()
+        return self._drivers.get(driver_id)
+
+    def _memoized(self, func, *args) -> dict:
+        """Return the memoized result of func(*args)."""
+
+        key = (func.__name__,) + args
+        if key not in self._summaries:
+            self._summaries[key] = func(*args)
+        return self._summaries[key]
+
     def driver_summary(self, driver_id: int, season_info: bool = True) -> dict:
-        """Return a summary for the driver in this season."""
-
-        for driver in self.standings:
-            if driver.driver_id == driver_id:
-                _summary = {
-                    "position": driver.position,
-                    "raced": driver.races,
-                    "points": driver.points,
-                    "wins": driver.wins,
-                    "podiums": driver.podiums,
-                    "top5": driver.top5,
-                    "top10": driver.top10,
-                    "incidents": driver.incidents,
-                    "laps": driver.laps,
-                    "cpi": driver.corners_per_incident,
-                    "avg_start": driver.avg_start,
-                    "avg_finish": driver.avg_finish,
-                }
-                if season_info:
-                    _summary.update({
-                        "season": {
-                            "id": self.season["league_season_id"],
-                            "name": self.season["league_season_name"],
-                        },
-                        "league": {
-                            "id": self.league["leagueid"],
-                            "name": self.league["leaguename"],
-                        },
-                        "drivers": self.leaderboard.drivers,
-                        "races": self.leaderboard.races,
-                    })
-                else:
-                    _summary.update({
-                        "driver": driver.driver,
-                        "driver_id": driver.driver_id,
-                    })
-                return _summary
-        return {}
+        """Return a summary for the driver in this season.
+
+        Summaries are memoized, treat the returned dictionary as read-only.
+        """
+
+        return self._memoized(self._driver_summary, driver_id, season_info)
+
+    def _driver_summary(self, driver_id: int, season_info: bool) -> dict:
+        """Build the driver summary, see `driver_summary`."""
+
+        driver = self._standing(driver_id)
+        if driver is None:
+            return {}
+
+        _summary = {
+            "position": driver.position,
+            "raced": driver.races,
+            "points": driver.points,
+            "wins": driver.wins,
+            "podiums": driver.podiums,
+            "top5": driver.top5,
+            "top10": driver.top10,
+            "incidents": driver.incidents,
+            "laps": driver.laps,
+            "cpi": driver.corners_per_incident,
+            "avg_start": driver.avg_start,
+            "avg_finish": driver.avg_finish,
+        }
+        if season_info:
+            _summary.update({
+                "season": {
+                    "id": self.season["league_season_id"],
+                    "name": self.season["league_season_name"],
+                },
+                "league": {
+                    "id": self.league["leagueid"],
+                    "name": self.league["leaguename"],
+                },
+                "drivers": self.leaderboard.drivers,
+                "races": self.leaderboard.races,
+            })
+        else:
+            _summary.update({
+                "driver": driver.driver,
+                "driver_id": driver.driver_id,
+            })
+        return _summary
 
     def race_summary(self, race_id: int, season_info: bool = True,
-                     results: bool = True) -> dict:
-        """Return a summary for this race in the season."""
-
-        for race in self.races:
-            if race.race["subsessionid"] == race_id:
-                _summary = {
-                    "id": race.subsessionid,
-                    "time": race.race_time,
-                    "sim_time": race.race["simulatedstarttime"],
-                    "temp": "{}{}".format(
-                        race.race["weather_temp_value"],
-                        "F"
-                        if race.race["weather_temp_units"] == 0 else
-                        "C",
-                    ),
-                    "track": race.race["track_name"],
-                    "config": race.race["track_config_name"],
-                    "drivers": len(race.results),
-                    "sof": race.race["eventstrengthoffield"],
-                    "laps": race.race["eventlapscomplete"],
-                }
-
-                if results:
-                    driver_results = []
-                    for driver in race.results:
-                        driver_result = race.driver_summary(
-                            driver["custid"],
-                            race_info=False,
-                            driver_info=True,
-                            lap_info=True,
-                        )
-                        if driver_result:
-                            driver_results.append(driver_result)
-
-                    if driver_results:
-                        _summary["results"] = driver_results
-                else:
-                    _summary["winner"] = {
-                        "name": race.winner,
-                        "id": race.winner_id,
-                    }
-
-                if race.multiclass:
-                    _summary["classes"] = race.class_summary(
-                        include_winners=not results,
+                     results: bool = True, lap_files: bool = False,
+                     lap_format: int = 1) -> dict:
+        """Return a summary for this race in the season.
+
+        With lap_files, results carry the lap statistics and the path to
+        a lap file (from `Race.lap_summary`) instead of every lap. Laps
+        are otherwise listed in the lap_format version.
+
+        Summaries are memoized, treat the returned dictionary as read-only.
+        """
+
+        # pylint: disable=too-many-arguments
+        return self._memoized(
+            self._race_summary,
+            race_id,
+            season_info,
+            results,
+            lap_files,
+            lap_format,
+        )
+
+    def _race_summary(self, race_id: int, season_info: bool,
+                      results: bool, lap_files: bool,
+                      lap_format: int) -> dict:
+        """Build the race summary, see `race_summary`."""
+
+        # pylint: disable=too-many-arguments
+        race = self._races.get(race_id)
+        if race is None:
+            return {}
+
+        _summary = {
+            "id": race.subsessionid,
+            "time": race.race_time,
+            "sim_time": race.race["simulatedstarttime"],
+            "temp": "{}{}".format(
+                race.race["weather_temp_value"],
+                "F"
+                if race.race["weather_temp_units"] == 0 else
+                "C",
+            ),
+            "track": race.race["track_name"],
+            "config": race.race["track_config_name"],
+            "drivers": len(race.results),
+            "sof": race.race["eventstrengthoffield"],
+            "laps": race.race["eventlapscomplete"],
+        }
+
+        if results:
+            driver_results = []
+            for driver in race.results:
+                driver_result = race.driver_summary(
+                    driver["custid"],
+                    race_info=False,
+                    driver_info=True,
+                    lap_info=True,
+                    lap_list=not lap_files,
+                    lap_format=lap_format,
+                )
+                if driver_result and lap_files:
+                    driver_result = dict(
+                        driver_result,
+                        lap_file=race.lap_file(driver["custid"]),
                     )
+                if driver_result:
+                    driver_results.append(driver_result)
+
+            if driver_results:
+                _summary["results"] = driver_results
+        else:
+            _summary["winner"] = {
+                "name": race.winner,
+                "id": race.winner_id,
+            }
 
-                if season_info:
-                    info = dict(self._top_level_info)
-                    info["race"] = _summary
-                    return info
+        if race.multiclass:
+            _summary["classes"] = race.class_summary(
+                include_winners=not results,
+            )
 
-                return _summary
+        if season_info:
+            info = dict(self._top_level_info)
+            info["race"] = _summary
+            return info
 
-        return {}
+        return _summary
 
     @property
     def calendar_summary(self) -> list:
@@ -147,14 +233,8 @@ class Season:
         _summary = []
         for row in self.calendar.get("rows", []):
 
-            if row["subsessionid"]:
-                found = False
-                for known in self.races:
-                    if known.subsessionid == row["subsessionid"]:
-                        found = True
-                        break
-                if found:
-                    continue
+            if row["subsessionid"] and row["subsessionid"] in self._races:
+                continue
 
             start_at = datetime.utcfromtimestamp(row["launchat"] / 1000)
             if start_at > datetime.utcnow() - timedelta(days=1):
@@ -19,19 +19,26 @@ Options:
     --season=<id>        season to pull results from
     --week=<id>          week of season to pull results from [default: -1]
     --output=<path>      output directory (if not using db) [default: results]
+    --priority=<lane>    request priority lane, one of interactive,
+                         incremental or backfill [default: incremental]
     --league             populate basic information about the club/league
     --seasons            populate seasons for the club/league
     --members            populate members for the club/league
     --races              populate race and lap data for the club's seasons
+    --profile=<dir>      write per phase profiles to the directory
 """
 
 
 import os
+import sys
 from functools import wraps
 
+from . import catalog
 from .stats import Client
+from .stats.constants import Priority
 from .utils import get_args
 from .utils import config_client
+from .profiler import profiled
 from .storage import Server
 from .storage import Databases
 
@@ -200,15 +207,8 @@ def validate_integer_arguments(args) -> None:
             raise SystemExit("Invalid value for {}: {}".format(arg, args[arg]))
 
 
-def main() -> None:
-    """Command line entry point."""
-
-    args = get_args(__doc__)
-
-    validate_integer_arguments(args)
-    os.environ["IRACE_RESULTS"] = args["--output"]
-
-    config_client(args)
+def _populate(args: dict) -> None:
+    """Run the requested populate steps."""
 
     if args.pop("--league"):
         fetch_league(args)
@@ -227,5 +227,49 @@ def main() -> None:
         fetch_races(args)
 
 
+def _profile_phases() -> dict:
+    """Return the functions of each phase, for `profiler.profiled`."""
+
+    module = sys.modules[__name__]
+    return {
+        "load": (
+            (Server, "read_all"),
+            (Server, "exists"),
+        ),
+        "league": ((module, "fetch_league"),),
+        "members": ((module, "fetch_members"),),
+        "seasons": ((module, "fetch_seasons"),),
+        "races": ((module, "fetch_results"),),
+        "laps": ((module, "_fetch_laps"),),
+        "writes": ((Server, "write"),),
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+
+    args = get_args(__doc__)
+
+    validate_integer_arguments(args)
+    os.environ["IRACE_RESULTS"] = args["--output"]
+
+    try:
+        priority = Priority.NAMES[args.pop("--priority")]
+    except KeyError:
+        raise SystemExit("Invalid priority, use one of: {}".format(
+            ", ".join(Priority.NAMES),
+        )) from None
+
+    config_client(args)
+
+    with profiled(args.pop("--profile"), _profile_phases()):
+        with Client.priority(priority):
+            _populate(args)
+
+    if Client.cache.get("__populated"):
+        # share the freshly parsed catalog with other processes
+        catalog.save()
+
+
 if __name__ == "__main__":
     main()
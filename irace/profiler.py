@@ -0,0 +1,393 @@
+"""Per phase profiling for the command line entry points.
+
+Phases are marked by wrapping module functions with `profiled`, so there
+is nothing to pay when profiling is off. Time is attributed to the
+innermost active phase in each thread, anything outside of a phase is
+attributed to "other".
+
+For each phase the profile directory gets:
+
+    <phase>.pstats       cProfile stats, for `python -m pstats`
+    <phase>.collapsed    collapsed stacks, for flamegraph.pl or speedscope
+
+And profile.json holds the calls, seconds, tracemalloc peak and the top
+allocation sites of every phase. Seconds are summed over threads, so
+include waiting on other threads, unlike the CPU seconds. As tracemalloc
+is process wide, peaks are shared between phases running in other
+threads.
+
+Only one cProfile profiler can be active at a time from Python 3.12, so
+cProfile and tracemalloc detail is only recorded on the main thread.
+Phases entered from other threads record their calls, seconds and RSS.
+"""
+
+
+import io
+import os
+import json
+import time
+import cProfile
+import inspect
+import pstats
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+from .stats.logger import log
+
+
+OTHER = "other"
+TOP_SITES = 10
+SITES_MIN_BYTES = 1 << 22
+
+
+class _Phase:
+    """Totals of a single phase."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak = 0
+        self.max_rss = 0
+        self.sites_peak = 0
+        self.sites = []
+        self.profiles = []
+
+    @property
+    def summary(self) -> dict:
+        """Return the totals of this phase."""
+
+        return {
+            "calls": self.calls,
+            "seconds": round(self.seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "peak_bytes": self.peak,
+            "max_rss_kib": self.max_rss,
+            "top_sites": self.sites,
+        }
+
+
+class Profiler:
+    """Profiles the phases of a run, see `profiled`.
+
+    Without detail, only the calls, seconds and maximum RSS of each phase
+    are recorded, leaving out cProfile and tracemalloc.
+    """
+
+    def __init__(self, path: str, detail: bool = True):
+        self.path = path
+        self.detail = detail
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases = {}
+        self._patched = []
+
+    def _phase(self, name: str) -> _Phase:
+        """Return the phase by name, creating it if needed."""
+
+        with self._lock:
+            if name not in self._phases:
+                self._phases[name] = _Phase(name)
+            return self._phases[name]
+
+    def _thread_state(self) -> threading.local:
+        """Return the phase stack and profiles of the current thread."""
+
+        local = self._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.profiles = {}
+            local.started = 0.0
+            local.cpu_started = 0.0
+            local.detail = self.detail and (
+                threading.current_thread() is threading.main_thread()
+            )
+        return local
+
+    def _resume(self, local, name: str) -> None:
+        """Start profiling the named phase in this thread."""
+
+        if not local.detail:
+            local.started = time.perf_counter()
+            local.cpu_started = time.thread_time()
+            return
+
+        profile = local.profiles.get(name)
+        if profile is None:
+            profile = cProfile.Profile()
+            local.profiles[name] = profile
+            phase = self._phase(name)
+            with self._lock:
+                phase.profiles.append(profile)
+
+        if hasattr(tracemalloc, "reset_peak"):  # python 3.9+
+            tracemalloc.reset_peak()
+        local.started = time.perf_counter()
+        local.cpu_started = time.thread_time()
+        profile.enable()
+
+    def _pause(self, local, name: str) -> None:
+        """Stop profiling the named phase in this thread."""
+
+        if local.detail:
+            local.profiles[name].disable()
+        seconds = time.perf_counter() - local.started
+        cpu_seconds = time.thread_time() - local.cpu_started
+        peak = tracemalloc.get_traced_memory()[1] if local.detail else 0
+        max_rss = resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss if resource else 0
+
+        phase = self._phase(name)
+        with self._lock:
+            phase.seconds += seconds
+            phase.cpu_seconds += cpu_seconds
+            phase.peak = max(phase.peak, peak)
+            phase.max_rss = max(phase.max_rss, max_rss)
+            # snapshots are slow, only take them as the peak doubles
+            snapshot = peak > max(phase.sites_peak * 2, SITES_MIN_BYTES)
+            if snapshot:
+                phase.sites_peak = peak
+
+        if snapshot:
+            phase.sites = _top_sites()
+
+    def enter(self, name: str) -> None:
+        """Enter the named phase in this thread."""
+
+        local = self._thread_state()
+        if local.stack and local.stack[-1] == name:
+            local.stack.append(name)
+            return
+
+        if local.stack:
+            self._pause(local, local.stack[-1])
+        local.stack.append(name)
+        phase = self._phase(name)
+        with self._lock:
+            phase.calls += 1
+        self._resume(local, name)
+
+    def exit(self) -> None:
+        """Exit the current phase in this thread."""
+
+        local = self._thread_state()
+        name = local.stack.pop()
+        if local.stack and local.stack[-1] == name:
+            return
+
+        self._pause(local, name)
+        if local.stack:
+            self._resume(local, local.stack[-1])
+
+    def wrap(self, name: str, func):
+        """Return func wrapped to run in the named phase."""
+
+        @functools.wraps(func)
+        def _wrapped(*args, **kwargs):
+            self.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+
+        return _wrapped
+
+    def patch(self, phases: dict) -> None:
+        """Wrap the functions of each phase, in place.
+
+        Args::
+
+            phases: dictionary of {phase: [(module or class, name), ...]}
+        """
+
+        for name, targets in phases.items():
+            for owner, attr in targets:
+                original = inspect.getattr_static(owner, attr)
+                if isinstance(original, staticmethod):
+                    wrapped = staticmethod(self.wrap(name, original.__func__))
+                else:
+                    wrapped = self.wrap(name, original)
+                setattr(owner, attr, wrapped)
+                self._patched.append((owner, attr, original))
+
+    def restore(self) -> None:
+        """Undo all `patch`es."""
+
+        while self._patched:
+            owner, attr, original = self._patched.pop()
+            setattr(owner, attr, original)
+
+    @property
+    def summary(self) -> dict:
+        """Return the totals of all phases, by name."""
+
+        with self._lock:
+            return {
+                name: phase.summary for name, phase in
+                sorted(self._phases.items())
+            }
+
+    def save(self) -> None:
+        """Write the stats of all phases to our path."""
+
+        os.makedirs(self.path, exist_ok=True)
+
+        summary = self.summary
+        for name, phase in sorted(self._phases.items()):
+            stats = None
+            for profile in phase.profiles:
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profile)
+                    else:
+                        stats.add(profile)
+                except TypeError:  # nothing was profiled
+                    continue
+
+            if stats is None:
+                continue
+
+            # hide our own enter and exit calls
+            for func in [x for x in stats.stats if x[0] == __file__]:
+                del stats.stats[func]
+            for *_, callers in stats.stats.values():
+                for func in [x for x in callers if x[0] == __file__]:
+                    del callers[func]
+
+            stats.dump_stats(os.path.join(self.path, name + ".pstats"))
+            with io.open(os.path.join(self.path, name + ".collapsed"), "w",
+                         encoding="utf-8") as open_file:
+                for stack, value in collapsed_stacks(stats):
+                    open_file.write("{} {:d}\n".format(stack, value))
+
+        with io.open(os.path.join(self.path, "profile.json"), "w",
+                     encoding="utf-8") as open_file:
+            json.dump(summary, open_file, indent=4, sort_keys=True)
+
+        for name, totals in summary.items():
+            log.info(
+                "Profiled %s: %d calls, %.3fs, %.3fs CPU, peak %.1f MiB",
+                name,
+                totals["calls"],
+                totals["seconds"],
+                totals["cpu_seconds"],
+                totals["peak_bytes"] / 1048576,
+            )
+        log.info("Profile written to %s", self.path)
+
+
+def _top_sites() -> list:
+    """Return the top allocation sites currently traced."""
+
+    sites = []
+    for stat in tracemalloc.take_snapshot().statistics("lineno"):
+        frame = stat.traceback[0]
+        if frame.filename in (__file__, tracemalloc.__file__):
+            continue
+        sites.append({
+            "site": "{}:{}".format(frame.filename, frame.lineno),
+            "bytes": stat.size,
+            "blocks": stat.count,
+        })
+        if len(sites) == TOP_SITES:
+            break
+    return sites
+
+
+def _frame(func: tuple) -> str:
+    """Return a collapsed stack frame name for the pstats function."""
+
+    filename, lineno, name = func
+    if filename == "~":  # built in
+        return name.replace(";", ":")
+    return "{} ({}:{:d})".format(
+        name,
+        os.path.basename(filename),
+        lineno,
+    ).replace(";", ":")
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64,
+                     min_seconds: float = 0.00001) -> list:
+    """Return (stack, microseconds) tuples of the self time in stats.
+
+    cProfile only records callers, so the time of a function called from
+    several places is split between its stacks by their share of its
+    cumulative time. Stacks under min_seconds are dropped.
+    """
+
+    # pylint: disable=too-many-locals
+    callees = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        known = [x for x in callers if x in stats.stats]
+        if not known:
+            roots.append(func)
+        for caller in known:
+            callees.setdefault(caller, []).append(
+                (func, callers[caller][3]),
+            )
+
+    stacks = {}
+
+    def _walk(func, share, path):
+        _, _, self_time, cumulative, _ = stats.stats[func]
+        path = path + (func,)
+        value = self_time * share
+        if value:
+            stack = ";".join(_frame(x) for x in path)
+            stacks[stack] = stacks.get(stack, 0.0) + value
+
+        # stop at stacks too small to show, the paths multiply quickly
+        if len(path) >= max_depth or cumulative * share < min_seconds:
+            return
+
+        for callee, edge_time in callees.get(func, ()):
+            callee_time = stats.stats[callee][3]
+            if callee in path or not edge_time or not callee_time:
+                continue
+            _walk(callee, share * min(1.0, edge_time / callee_time), path)
+
+    for root in roots:
+        _walk(root, 1.0, ())
+
+    return [
+        (stack, int(value * 1000000)) for stack, value in
+        sorted(stacks.items()) if value >= min_seconds
+    ]
+
+
+@contextmanager
+def profiled(path: str, phases: dict):
+    """Context manager to profile the phases if a path is given.
+
+    Args::
+
+        path: directory to write the profile to, None to not profile
+        phases: dictionary of {phase: [(module or class, name), ...]}
+    """
+
+    if not path:
+        yield None
+        return
+
+    profiler = Profiler(path)
+    profiler.patch(phases)
+    tracemalloc.start()
+    profiler.enter(OTHER)
+    try:
+        yield profiler
+    finally:
+        profiler.exit()
+        tracemalloc.stop()
+        profiler.restore()
+        profiler.save()
@@ -5,3 +5,4 @@ This code was initially forked from https://github.com/jeysonmc/ir_webstats
 
 
 from .client import Client  # noqa: F401
+from .aio import ThreadedAsyncStats  # noqa: F401
@@ -0,0 +1,181 @@
+"""asyncio interface to the stats client, backed by worker threads."""
+
+
+import asyncio
+import inspect
+import threading
+from itertools import islice
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import Stats
+from .client import Client
+from .transport import _Client
+from .constants import Pages
+from .constants import Priority
+
+
+# Stats methods which don't make requests, left off the asyncio client
+_LOCAL = (
+    "priority",
+    "set_debug",
+    "set_credentials",
+    "has_credentials",
+    "metrics",
+    "emit_metrics",
+)
+
+
+def _coroutine(name: str):
+    """Create a coroutine method which calls the named `Stats` method."""
+
+    method = getattr(Stats, name)
+
+    @wraps(method)
+    async def _method(self, *args, timeout: float = None, **kwargs):
+        return await self._call(  # pylint: disable=protected-access
+            getattr(self.stats, name),
+            *args,
+            timeout=timeout,
+            **kwargs
+        )
+
+    return _method
+
+
+def _iterator(name: str):
+    """Create an async generator method for the named `Stats` iterator.
+
+    Rows are pulled from the iterator a page at a time in a worker thread,
+    the timeout applies to each page.
+    """
+
+    method = getattr(Stats, name)
+
+    @wraps(method)
+    async def _method(self, *args, timeout: float = None, **kwargs):
+        # pylint: disable=protected-access
+        # shared by every page, reaches the iterator's prefetch threads
+        abort = threading.Event()
+        rows = await self._call(
+            getattr(self.stats, name),
+            *args,
+            timeout=timeout,
+            abort=abort,
+            **kwargs
+        )
+        lock = threading.Lock()
+
+        def _page():
+            with lock:
+                return list(islice(rows, Pages.NUM_ENTRIES))
+
+        def _close():
+            with lock:
+                rows.close()
+
+        try:
+            while True:
+                page = await self._call(_page, timeout=timeout, abort=abort)
+                if not page:
+                    return
+                for row in page:
+                    yield row
+        finally:
+            abort.set()
+            _Client.wake()
+            # waits for any page still being read by an abandoned call
+            try:
+                self._executor.submit(_close)
+            except RuntimeError:
+                pass  # closed client, the iterator is left to be collected
+
+    return _method
+
+
+def _wrap_stats(cls):
+    """Add a coroutine or async generator for each `Stats` request method."""
+
+    for name, _ in inspect.getmembers(Stats, inspect.isfunction):
+        if name.startswith("_") or name in _LOCAL:
+            continue
+        if name.startswith("iter_"):
+            setattr(cls, name, _iterator(name))
+        else:
+            setattr(cls, name, _coroutine(name))
+    return cls
+
+
+@_wrap_stats
+class ThreadedAsyncStats:  # pylint: disable=too-few-public-methods
+    """asyncio facade of the iRacing stats client, backed by threads.
+
+    Exposes the `Stats` request methods as coroutines, and the `iter_*`
+    methods as async generators (`async for`). Each call runs the blocking
+    `Stats` method in one of `max_workers` threads, which it holds until
+    the response arrives, so at most `max_workers` calls are in progress
+    and the rest wait their turn. Calls share the wrapped client's
+    login/cookie state as well as the pooled HTTP session and rate limiter.
+
+    Every method accepts an optional `timeout` (seconds). Cancelled or
+    timed out calls which are still waiting on the rate limiter, including
+    pages prefetched by the iterators, are abandoned before reaching
+    iRacing. A request already sent is not interrupted, its thread stays
+    busy until the response or the client's request timeout. Requests are
+    scheduled in the `priority` lane (a `constants.Priority` value).
+    """
+
+    def __init__(self, stats: Stats = None, timeout: float = None,
+                 max_workers: int = 32, priority: int = None):
+        self.stats = stats or Client
+        self.timeout = timeout
+        self.priority = Priority.DEFAULT if priority is None else priority
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="irace-async",
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker threads."""
+
+        self._executor.shutdown(wait=False)
+
+    async def _call(self, func, *args, timeout: float = None,
+                    abort: threading.Event = None, **kwargs):
+        """Run func in a worker thread, abandoning it if we're cancelled.
+
+        The abort event is set when the call is cancelled or times out, a
+        new one is used if not given.
+        """
+
+        if abort is None:
+            abort = threading.Event()
+
+        def _run():
+            _Client.local.abort = abort
+            try:
+                with self.stats.priority(self.priority):
+                    return func(*args, **kwargs)
+            finally:
+                _Client.local.abort = None
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            _run,
+        )
+
+        try:
+            return await asyncio.wait_for(
+                future,
+                self.timeout if timeout is None else timeout,
+            )
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            abort.set()
+            _Client.wake()
+            raise
@@ -1,25 +1,32 @@
 """Stats client."""
 
 
+import io
 import os
+import sys
 import json
 import time
 import atexit
+import threading
+from contextlib import contextmanager
 from urllib.parse import urlencode
 
-from requests import Session
 from requests import Request
 from requests import Response
-from requests_throttler import throttler
 
 from . import utils
 from . import search
 from . import drivers
 from .logger import log
 from .logger import set_log_level
-from .constants import Pages
+from .flight import flight_key
+from .flight import SingleFlight
+from .session import load_session
+from .session import store_session
+from .transport import _Client
 from .constants import Charts
 from .constants import Sorting
+from .constants import Priority
 from .constants import URLs
 
 
@@ -36,10 +43,12 @@ class RequestOptions:
     """Options for individual requests."""
 
     def __init__(self, parsing: ParsingOptions = None, headers: dict = None,
-                 cookies: dict = None):
+                 cookies: dict = None, priority: int = None):
         self.parsing = parsing or ParsingOptions()
         self.headers = headers or {}
         self.cookies = cookies or {}
+        # scheduling lane (constants.Priority), None for the thread default
+        self.priority = priority
 
     def merge_headers(self, headers: dict) -> None:
         """Merge our headers and cookies into the request headers."""
@@ -57,45 +66,6 @@ class RequestOptions:
         headers["cookie"] = cookie
 
 
-class _Client:
-    """Static client to manage the connection pool."""
-
-    _client = None
-
-    @staticmethod
-    def _get():
-        """Return and/or create the static throttled HTTP client."""
-
-        if _Client._client is None:
-            throttler.logger.level = 40  # set log level to logging.ERROR
-
-            _Client._client = throttler.BaseThrottler(
-                name="client",
-                delay=0.1,
-                session=Session(),
-            )
-            _Client._client.start()
-
-            atexit.register(_Client.app_exit)
-
-        return _Client._client
-
-    @staticmethod
-    def send_request(request: Request) -> Response:
-        """Sends a request using our connection pool and rate limiter."""
-
-        response = _Client._get().submit(request)  # async
-        return response.get_response(timeout=3600)  # sync (when timeout != 0)
-
-    @staticmethod
-    def app_exit():
-        """Exit function to clean up the throttled client."""
-
-        if _Client._client is not None:
-            _Client._client.shutdown()
-            _Client._client = None
-
-
 class Stats:  # pylint: disable=R0904
     """iRacing stats client."""
 
@@ -103,6 +73,7 @@ class Stats:  # pylint: disable=R0904
         """Create a new stats client."""
 
         self.num_requests = 0
+        self._requests_lock = threading.Lock()
 
         self._debug = False
         self.set_debug(bool(int(os.getenv("IRACE_DEBUG") or 0)))
@@ -124,6 +95,11 @@ class Stats:  # pylint: disable=R0904
             "cookie": "",
             "custid": int(os.getenv("IRACING_CUSTID") or 0),
             "url": os.getenv("IRACING_LOGIN") or URLs.LOGIN,
+            # shared between processes, set IRACE_SESSION=0 to disable
+            "session": os.path.expanduser(
+                os.getenv("IRACE_SESSION") or
+                os.path.join("~", ".irace", "session.json")
+            ),
             "data": {
                 "username": os.getenv("IRACING_USERNAME"),
                 "password": os.getenv("IRACING_PASSWORD"),
@@ -131,6 +107,68 @@ class Stats:  # pylint: disable=R0904
                 "todaysdate": "",
             },
         }
+        self._refresher = None
+        self._login_lock = threading.RLock()
+        self._flights = SingleFlight()
+
+        # pages fetched concurrently by the iter_* methods
+        self.prefetch = int(os.getenv("IRACE_PREFETCH") or 4)
+
+        # IRACE_METRICS=1 prints the metrics at exit, or a path to write them
+        if os.getenv("IRACE_METRICS"):
+            atexit.register(self.emit_metrics, os.getenv("IRACE_METRICS"))
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the request telemetry.
+
+        Includes per endpoint request counts, status codes, response bytes,
+        server latency, time spent waiting on the rate limiter and retries.
+        """
+
+        snapshot = _Client.metrics()
+        snapshot.update({
+            "requests": self.num_requests,
+            "coalesced": self._flights.coalesced,
+        })
+        return snapshot
+
+    def emit_metrics(self, target: str = "1") -> None:
+        """Write the metrics snapshot to stderr (1) or a file path."""
+
+        if not self.num_requests:
+            return
+
+        as_json = json.dumps(self.metrics(), indent=4, sort_keys=True)
+        if target in ("1", "-"):
+            print(as_json, file=sys.stderr)
+            return
+
+        try:
+            with io.open(target, "w", encoding="utf-8") as open_file:
+                open_file.write(as_json)
+        except Exception as error:
+            log.error("Failed to write metrics to %s: %r", target, error)
+
+    @staticmethod
+    @contextmanager
+    def priority(lane: int):
+        """Context manager to set the priority lane for requests.
+
+        Applies to requests made by the current thread, for example::
+
+            with Client.priority(Priority.BACKFILL):
+                Client.session_laps(subsession, group)
+        """
+
+        previous = getattr(_Client.local, "priority", None)
+        _Client.local.priority = lane
+        try:
+            yield
+        finally:
+            if previous is None:
+                del _Client.local.priority
+            else:
+                _Client.local.priority = previous
 
     def set_debug(self, debug: bool) -> None:
         """Set the logging level."""
@@ -153,18 +191,107 @@ class Stats:  # pylint: disable=R0904
 
         self.set_credentials(username, password)
 
-        if force or (self.__auth["last"] < (time.time() - self.__auth["min"])):
-            log.info("Performing login")
-            self._req(
-                self.__auth["url"],
-                data=self.__auth["data"],
-                options=RequestOptions(
-                    ParsingOptions(login=True, json_response=False),
-                ),
-            )
-            self.__auth["last"] = time.time()
+        # only one thread logs in, the others wait and use the new cookie
+        with self._login_lock:
+            if not force and self.__auth["last"] < (
+                    time.time() - self.__auth["min"]):
+                self._restore_session(self.__auth["min"])
+
+            if force or (
+                    self.__auth["last"] < (time.time() - self.__auth["min"])):
+                self._login()
+
+            custid = self.__auth["custid"]
+            self._populate_cache(force)
+            if custid != self.__auth["custid"]:
+                self._save_session()
+
+    def _login(self) -> None:
+        """Send the login request and store the session cookie."""
+
+        log.info("Performing login")
+        self._req(
+            self.__auth["url"],
+            data=self.__auth["data"],
+            options=RequestOptions(
+                ParsingOptions(login=True, json_response=False),
+            ),
+        )
+        self.__auth["last"] = time.time()
+        self._save_session()
+        self._schedule_refresh()
 
-        self._populate_cache(force)
+    def _restore_session(self, max_age: int) -> bool:
+        """Load a session persisted by another process, if fresh enough.
+
+        Returns:
+            boolean if the stored session is now in use
+        """
+
+        path = self.__auth["session"]
+        stored = load_session(
+            path,
+            self.__auth["data"]["username"],
+            max(self.__auth["last"], time.time() - max_age),
+        )
+        if not stored:
+            return False
+
+        self.__auth["cookie"] = stored["cookie"]
+        self.__auth["last"] = stored["last"]
+        self.__auth["custid"] = stored.get("custid") or self.__auth["custid"]
+        log.info("Using stored session from %s", path)
+        self._schedule_refresh()
+        return True
+
+    def _save_session(self) -> None:
+        """Persist the session cookie for other processes."""
+
+        store_session(self.__auth["session"], {
+            "username": self.__auth["data"]["username"],
+            "cookie": self.__auth["cookie"],
+            "last": self.__auth["last"],
+            "custid": self.__auth["custid"],
+        })
+
+    def _schedule_refresh(self) -> None:
+        """Refresh the session in the background once it reaches min age."""
+
+        if self._refresher is not None:
+            self._refresher.cancel()
+
+        self._refresher = threading.Timer(
+            max(0, self.__auth["last"] + self.__auth["min"] - time.time()),
+            self._refresh,
+        )
+        self._refresher.daemon = True
+        self._refresher.start()
+
+    def _refresh(self) -> None:
+        """Background session refresh, prefers sessions from elsewhere."""
+
+        with self._login_lock:
+            if self.__auth["last"] > time.time() - self.__auth["min"]:
+                return  # refreshed by another thread meanwhile
+
+            if self._restore_session(self.__auth["min"]):
+                return
+
+            if not self.has_credentials():
+                return
+
+            try:
+                self._login()
+            except Exception as error:
+                log.warning("Background login failed: %r", error)
+
+    def has_credentials(self) -> bool:
+        """Return a boolean of if we have credentials to login with."""
+
+        return bool(
+            self.__auth["data"]["username"] and
+            self.__auth["data"]["password"]
+        )
 
     def _populate_cache(self, force: bool = False):
         """Gets general information from iRacing service.
@@ -202,39 +329,46 @@ class Stats:  # pylint: disable=R0904
             "year_and_quarter": "YearAndQuarterListing"
         }
 
+        try:
+            found = utils.get_irservice_vars(items.values(), resp)
+        except Exception as error:
+            log.warning("Failed to parse cache: %r", error)
+            found = {}
+
         errored = False
         for item, key in items.items():
-            try:
-                self.cache[item] = utils.get_irservice_var(key, resp)
-            except Exception as error:
-                log.warning("Failed to parse %s: %r", item, error)
+            if key in found:
+                self.cache[item] = found[key]
+            else:
+                log.warning("Failed to parse %s: not found", item)
                 errored = True
 
         if not errored:
             self.cache["__populated"] = True
 
-    def __del__(self):
-        """Standard destructor method."""
-
-        _Client.app_exit()
-        del self
-
     def _req(self, url, data: dict = None, options: RequestOptions = None):
         """Create and send an HTTP request to iRacing."""
 
         if options is None:
             options = RequestOptions()
 
-        if not options.parsing.login and (
-                not self.__auth["last"] or self.__auth["last"] < (
-                    time.time() - self.__auth["max"])):
-            self.login()
-
-        resp = _Client.send_request(
-            self._get_request(url, data=data, options=options)
-        )
-
-        self.num_requests += 1
+        if not options.parsing.login and self._session_expired():
+            with self._login_lock:
+                if self._session_expired() and not self._restore_session(
+                        self.__auth["max"]):
+                    self.login()
+
+        request = self._get_request(url, data=data, options=options)
+
+        if options.parsing.login:
+            resp = self._send(request, Priority.INTERACTIVE)
+        else:
+            # identical requests in flight at the same time share a response
+            resp = self._flights.do(
+                flight_key(request),
+                lambda: self._send(request, options.priority),
+                getattr(_Client.local, "abort", None),
+            )
 
         resp.raise_for_status()
 
@@ -270,6 +404,41 @@ class Stats:  # pylint: disable=R0904
 
         return resp.text
 
+    def _iter_pages(self, fetch, window: int = None):
+        """Prefetching page iterator.
+
+        Page fetches keep the caller's priority lane and abort event, so
+        abandoning the caller also abandons its prefetched pages.
+        """
+
+        priority = _Client.priority()
+        abort = getattr(_Client.local, "abort", None)
+
+        def _fetch(page):
+            previous = getattr(_Client.local, "abort", None)
+            _Client.local.abort = abort
+            try:
+                with self.priority(priority):
+                    return fetch(page)
+            finally:
+                _Client.local.abort = previous
+
+        return utils.iter_pages(_fetch, window or self.prefetch)
+
+    def _session_expired(self) -> bool:
+        """Return a boolean of if the session cookie must be renewed."""
+
+        return not self.__auth["last"] or self.__auth["last"] < (
+            time.time() - self.__auth["max"])
+
+    def _send(self, request: Request, priority: int = None) -> Response:
+        """Send the request, counting it."""
+
+        resp = _Client.send_request(request, priority)
+        with self._requests_lock:
+            self.num_requests += 1
+        return resp
+
     def _get_request(self, url: str, data: dict,
                      options: RequestOptions) -> Request:
         """Generate the Request object."""
@@ -366,13 +535,16 @@ class Stats:  # pylint: disable=R0904
         )
 
     @utils.untested
-    def driver_search(self, query=None, page=1):
+    def driver_search(self, query=None, page=1, columns=None,
+                      compact=False):
         """Search for drivers using several search fields.
 
         Args::
 
             query: a `drivers.DriverSearch` instantiated object
             page: integer page to receive results from (default: 1)
+            columns: optional column names to keep (default: all)
+            compact: return a `utils.Table` instead of a list of dicts
 
         Returns:
             tuple of (results, total_pages)
@@ -385,12 +557,22 @@ class Stats:  # pylint: disable=R0904
             # magic number 29 is customer_id
             if int(res["d"]["r"][0]["29"]) == int(self.__auth["custid"]):
                 return (
-                    utils.format_results(res["d"]["r"][1:], res["m"]),
+                    utils.format_results(
+                        res["d"]["r"][1:],
+                        res["m"],
+                        columns,
+                        compact,
+                    ),
                     res["d"]["32"]
                 )
 
             return (
-                utils.format_results(res["d"]["r"], res["m"]),
+                utils.format_results(
+                    res["d"]["r"],
+                    res["m"],
+                    columns,
+                    compact,
+                ),
                 res["d"]["32"]
             )
         except Exception as error:
@@ -399,12 +581,14 @@ class Stats:  # pylint: disable=R0904
         return {}, 0
 
     @utils.untested
-    def results_archive(self, customer_id=None, query=None, page=1):
+    def results_archive(self, customer_id=None, query=None, page=1,
+                        columns=None, compact=False):
         """Search race results using various fields.
 
         Returns a tuple (results, total_results) so if you want all results
         you should request different pages (using page). Each page has 25
-        (Pages.NUM_ENTRIES) results max.
+        (Pages.NUM_ENTRIES) results max. Use `columns` and/or `compact` to
+        reduce the memory held per result (see `utils.format_results`).
         """
 
         data = search.post_data(
@@ -416,12 +600,34 @@ class Stats:  # pylint: disable=R0904
 
         if res["d"]:
             return (
-                utils.format_results(res["d"]["r"], res["m"]),
+                utils.format_results(
+                    res["d"]["r"],
+                    res["m"],
+                    columns,
+                    compact,
+                ),
                 res["d"]["46"]
             )
 
         return [], 0
 
+    def iter_results_archive(self, customer_id=None, query=None,
+                             columns=None, compact=False,
+                             window: int = None):
+        """Yield all race results for the query, prefetching pages."""
+
+        def _fetch(page):
+            results, total = self.results_archive(
+                customer_id,
+                query,
+                page,
+                columns,
+                compact,
+            )
+            return results, utils.page_count(total)
+
+        return self._iter_pages(_fetch, window)
+
     @utils.untested
     def all_seasons(self):
         """Get all season data available at series stats page."""
@@ -436,7 +642,7 @@ class Stats:  # pylint: disable=R0904
 
     @utils.untested
     def season_standings(self, season, season_options, sort_options=None,
-                         page=1):
+                         page=1, columns=None, compact=False):
         """Search season standings using various fields.
 
         Args::
@@ -445,9 +651,11 @@ class Stats:  # pylint: disable=R0904
             season_options: an instantiated SeasonOptions object
             sort_options: SortOptions class if desired (optional)
             page: integer page to return (default 1)
+            columns: optional column names to keep (default: all)
+            compact: return a `utils.Table` instead of a list of dicts
 
         Returns:
-            tuple (results, total_pages)
+            tuple (results, total_results)
         """
 
         lower, upper = utils.page_bounds(page)
@@ -471,12 +679,35 @@ class Stats:  # pylint: disable=R0904
 
         if res["d"]:
             return (
-                utils.format_results(res["d"]["r"], res["m"]),
+                utils.format_results(
+                    res["d"]["r"],
+                    res["m"],
+                    columns,
+                    compact,
+                ),
                 res["d"]["27"]
             )
 
         return [], 0
 
+    def iter_season_standings(self, season, season_options,
+                              sort_options=None, columns=None,
+                              compact=False, window: int = None):
+        """Yield all season standings, prefetching pages."""
+
+        def _fetch(page):
+            results, total = self.season_standings(
+                season,
+                season_options,
+                sort_options,
+                page,
+                columns,
+                compact,
+            )
+            return results, utils.page_count(total)
+
+        return self._iter_pages(_fetch, window)
+
     @utils.untested
     def hosted_results(self, session_options=None, date_range=None,
                        sort_options=None, page=1):
@@ -513,6 +744,21 @@ class Stats:  # pylint: disable=R0904
         # doesn't need utils.format_results
         return res["rows"], res["rowcount"]
 
+    def iter_hosted_results(self, session_options=None, date_range=None,
+                            sort_options=None, window: int = None):
+        """Yield all hosted race results, prefetching pages."""
+
+        def _fetch(page):
+            results, total = self.hosted_results(
+                session_options,
+                date_range,
+                sort_options,
+                page,
+            )
+            return results, utils.page_count(total)
+
+        return self._iter_pages(_fetch, window)
+
     @utils.untested
     def session_times(self, series_season, start, end):
         """Gets current and future sessions of series_season."""
@@ -524,14 +770,15 @@ class Stats:  # pylint: disable=R0904
         )
 
     @utils.untested
-    def series_race_results(self, season, race_week):
+    def series_race_results(self, season, race_week, columns=None,
+                            compact=False):
         """Gets races results of all races of season in specified raceweek."""
 
         res = self._req(
             URLs.SERIES_RACE_RESULTS,
             data={"seasonid": season, "raceweek": race_week}  # TODO no bounds?
         )
-        return utils.format_results(res["d"], res["m"])
+        return utils.format_results(res["d"], res["m"], columns, compact)
 
     def session_results(self, sub_session_id: int) -> dict:
         """Get the session (race) results."""
@@ -599,17 +846,19 @@ class Stats:  # pylint: disable=R0904
     def league_members(self, league_id):
         """Returns all members in a league (will paginate)."""
 
-        all_results = []
-        page = 1
+        return list(self.iter_league_members(league_id))
 
-        while True:
-            results = self._league_members(league_id, page=page)
-            all_results.extend(results)
-            page += 1
-            if len(results) < Pages.NUM_ENTRIES:
-                break
+    def iter_league_members(self, league_id, window: int = None):
+        """Yield all members in a league, prefetching pages.
 
-        return all_results
+        The member count is unknown, so pages are only requested ahead as
+        full pages are returned, up to `window`, until a short page.
+        """
+
+        return self._iter_pages(
+            lambda page: (self._league_members(league_id, page=page), None),
+            window,
+        )
 
     def _league_members(self, league_id, page=1):
         """Returns the member list for a league."""
@@ -70,6 +70,27 @@ class Official:
     ALL = (6, 7)
 
 
+class Priority:
+    """Request scheduling lanes, see `stats.Client.priority`."""
+
+    INTERACTIVE = 0  # someone is waiting on the result
+    INCREMENTAL = 1  # regular populate runs
+    BACKFILL = 2  # bulk historical fetching
+
+    DEFAULT = INCREMENTAL
+    NAMES = {
+        "interactive": INTERACTIVE,
+        "incremental": INCREMENTAL,
+        "backfill": BACKFILL,
+    }
+    # relative share of requests per lane when all lanes are waiting
+    WEIGHTS = {
+        INTERACTIVE: 16,
+        INCREMENTAL: 4,
+        BACKFILL: 1,
+    }
+
+
 class URLs:
     """URLs used through the stats service."""
 
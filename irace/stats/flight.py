@@ -0,0 +1,100 @@
+"""Coalescing of identical concurrent requests."""
+
+
+import threading
+
+from requests import Request
+
+from .transport import Cancelled
+
+
+class _Call:  # pylint: disable=too-few-public-methods
+    """A single call in flight, shared by all identical callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # False if the leader was cancelled, the result is not shared
+        self.shared = False
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one."""
+
+    # seconds between checks of a waiting follower's abort event
+    poll = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def _wait(self, call: _Call, abort: threading.Event = None) -> bool:
+        """Wait for the call to finish, False if we're aborted first."""
+
+        if abort is None:
+            return call.done.wait()
+
+        while not call.done.wait(self.poll):
+            if abort.is_set():
+                return False
+        return True
+
+    def do(self, key, func, abort: threading.Event = None):
+        """Call func, or wait for the result of the same call in flight.
+
+        Followers stop waiting if their abort event is set. If the leader
+        is cancelled its followers retry, one of them taking the lead.
+        """
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+
+            if not self._wait(call, abort):
+                raise Cancelled("Request cancelled while coalesced")
+            if call.shared:
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+        try:
+            call.result = func()
+            call.shared = True
+        except Cancelled:
+            raise
+        except Exception as error:
+            call.error = error
+            call.shared = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+def flight_key(request: Request) -> tuple:
+    """Return a hashable key for the request, for coalescing."""
+
+    def _normalize(values):
+        if not values:
+            return ()
+        return tuple(sorted((str(k), str(v)) for k, v in values.items()))
+
+    return (
+        request.method,
+        request.url,
+        _normalize(request.data or request.params),
+        _normalize(request.headers),
+    )
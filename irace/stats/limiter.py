@@ -0,0 +1,275 @@
+"""Adaptive token bucket rate limiting for the stats client."""
+
+
+import time
+import random
+import threading
+from datetime import datetime
+from datetime import timezone
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+from .constants import Priority
+
+
+class RateLimiter:
+    """Token bucket rate limiter which adapts to server pushback.
+
+    Tokens refill at `rate` per second, up to `burst` tokens. At most
+    `max_in_flight` requests may hold a token at once. The rate is cut on
+    429/503 responses (honouring Retry-After) and grows back towards
+    `max_rate` while responses stay healthy.
+
+    Waiting requests are queued FIFO per priority lane. Lanes share the
+    single rate by weighted fair queueing, so a busy backfill lane only
+    delays interactive requests by its weighted share.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    def __init__(self, rate: float = 10.0, burst: int = 10,
+                 max_in_flight: int = 4, min_rate: float = 0.5,
+                 max_rate: float = None, backoff: float = 0.5,
+                 recovery: float = 0.1, healthy: int = 20,
+                 weights: dict = None):
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 2
+        self.burst = max(1, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self.backoff = backoff
+        self.recovery = recovery
+        self.healthy = healthy
+
+        self._rate = min(max(rate, min_rate), self.max_rate)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._streak = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+        self.weights = dict(weights or Priority.WEIGHTS)
+        if min(self.weights.values()) <= 0:
+            raise ValueError("Priority lane weights must be positive")
+        # unknown lanes queue in the default, or the heaviest if not given
+        if Priority.DEFAULT in self.weights:
+            self.default = Priority.DEFAULT
+        else:
+            self.default = max(self.weights, key=self.weights.get)
+        self._lanes = {lane: deque() for lane in self.weights}
+        # weighted fair queueing virtual times, per lane and overall
+        self._finish = {lane: 0.0 for lane in self.weights}
+        self._virtual = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Current allowed requests per second."""
+
+        return self._rate
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a token."""
+
+        return sum(len(x) for x in self._lanes.values())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a token."""
+
+        return self._in_flight
+
+    @property
+    def idle(self) -> bool:
+        """True if no requests are waiting on or holding a token."""
+
+        with self._cond:
+            return not self._in_flight and not self.queued
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the limiter state."""
+
+        with self._cond:
+            return {
+                "rate": round(self._rate, 3),
+                "queued": self.queued,
+                "lanes": {lane: len(x) for lane, x in self._lanes.items()},
+                "in_flight": self._in_flight,
+                "paused": max(0.0, self._paused_until - time.monotonic()),
+            }
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last refill."""
+
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(
+                float(self.burst),
+                self._tokens + elapsed * self._rate,
+            )
+        self._updated = now
+
+    def _wait_time(self, now: float):
+        """Seconds until the head of the queue may proceed, None if blocked.
+
+        A None return means we're waiting on an in-flight request to finish.
+        """
+
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self._in_flight >= self.max_in_flight:
+            return None
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+        return 0.0
+
+    def _next_lane(self):
+        """Return the lane to serve next, by weighted fair queueing."""
+
+        best = None
+        best_finish = None
+        for lane, queue in self._lanes.items():
+            if queue:
+                finish = self._finish[lane] + 1.0 / self.weights[lane]
+                if best is None or finish < best_finish:
+                    best = lane
+                    best_finish = finish
+        return best
+
+    def acquire(self, timeout: float = None, abort: threading.Event = None,
+                priority: int = None) -> bool:
+        """Block until a token is available.
+
+        Args::
+
+            timeout: maximum seconds to wait, None to wait indefinitely
+            abort: optional event to abandon waiting when set
+            priority: lane to queue in, a `constants.Priority` value
+
+        Returns:
+            boolean True if acquired, False if the timeout expired or the
+            abort event was set while waiting
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+
+        if priority not in self._lanes:
+            priority = self.default
+        queue = self._lanes[priority]
+
+        with self._cond:
+            if not queue:
+                # an idle lane can't bank credit while it isn't waiting
+                self._finish[priority] = max(
+                    self._finish[priority],
+                    self._virtual,
+                )
+            queue.append(ticket)
+            try:
+                while True:
+                    if abort is not None and abort.is_set():
+                        return False
+
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(now)
+
+                    if wait == 0 and queue[0] is ticket and (
+                            self._next_lane() == priority):
+                        queue.popleft()
+                        self._finish[priority] += 1.0 / self.weights[
+                            priority
+                        ]
+                        self._virtual = self._finish[priority]
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        return True
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(
+                            wait,
+                            remaining,
+                        )
+
+                    self._cond.wait(wait or None)
+            finally:
+                if ticket in queue:
+                    queue.remove(ticket)
+                self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Wake all waiters, so they can notice an abort event."""
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self, status: int = None, retry_after: float = None) -> None:
+        """Return a token, adapting the rate given the response status.
+
+        Args::
+
+            status: HTTP status code of the response, None on a network error
+            retry_after: seconds the server asked us to wait, if any
+        """
+
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            now = time.monotonic()
+            self._refill(now)
+
+            if status in (429, 503):
+                self._streak = 0
+                self._rate = max(self.min_rate, self._rate * self.backoff)
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self._paused_until = max(
+                        self._paused_until,
+                        now + retry_after,
+                    )
+            elif status is not None and status < 500:
+                self._streak += 1
+                if self._streak >= self.healthy:
+                    self._streak = 0
+                    self._rate = min(
+                        self.max_rate,
+                        self._rate * (1 + self.recovery),
+                    )
+            else:
+                self._streak = 0
+
+            self._cond.notify_all()
+
+
+def parse_retry_after(value: str) -> float:
+    """Parse a Retry-After header value into seconds (or None)."""
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0,
+                  minimum: float = None) -> float:
+    """Full jitter exponential backoff delay for the retry attempt."""
+
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if minimum:
+        return max(delay, minimum)
+    return delay
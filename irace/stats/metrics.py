@@ -0,0 +1,124 @@
+"""Per endpoint request telemetry for the stats client."""
+
+
+import threading
+from urllib.parse import urlsplit
+from collections import defaultdict
+
+from .constants import URLs
+
+
+def endpoint(url: str) -> str:
+    """Return the endpoint name (path without base URL or query)."""
+
+    path = urlsplit(url).path.lstrip("/")
+    base = urlsplit(URLs.BASE).path.strip("/")
+    if base and path.startswith(base + "/"):
+        return path[len(base) + 1:]
+    return path
+
+
+class _Timing:
+    """Running total, count and maximum of a duration."""
+
+    __slots__ = ("total", "count", "max")
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Add a duration sample."""
+
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    @property
+    def summary(self) -> dict:
+        """Return the totals, rounded to milliseconds."""
+
+        return {
+            "total": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+        }
+
+
+class _Endpoint:
+    """Counters for a single endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes = 0
+        self.statuses = defaultdict(int)
+        self.latency = _Timing()
+        self.throttle_wait = _Timing()
+
+    @property
+    def summary(self) -> dict:
+        """Return a summary of this endpoint."""
+
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "status": {str(k): v for k, v in sorted(self.statuses.items())},
+            "latency": self.latency.summary,
+            "throttle_wait": self.throttle_wait.summary,
+        }
+
+
+class Metrics:
+    """Thread safe per endpoint request counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(_Endpoint)
+
+    # pylint: disable=too-many-arguments
+    def record(self, url: str, status: int = None, size: int = 0,
+               latency: float = 0.0, wait: float = 0.0,
+               retry: bool = False) -> None:
+        """Record a single attempt at a request.
+
+        Args::
+
+            url: full request URL
+            status: HTTP status code, None if the request errored
+            size: response body size in bytes
+            latency: seconds until the response headers were received
+            wait: seconds spent waiting on the rate limiter
+            retry: if this attempt was a retry
+        """
+
+        with self._lock:
+            counters = self._endpoints[endpoint(url)]
+            counters.requests += 1
+            counters.retries += int(retry)
+            counters.bytes += size
+            counters.throttle_wait.add(wait)
+            if status is None:
+                counters.errors += 1
+            else:
+                counters.statuses[status] += 1
+                counters.latency.add(latency)
+
+    def snapshot(self) -> dict:
+        """Return a summary of all endpoints."""
+
+        with self._lock:
+            return {
+                name: counters.summary for name, counters in
+                sorted(self._endpoints.items())
+            }
+
+    def reset(self) -> None:
+        """Clear all counters."""
+
+        with self._lock:
+            self._endpoints.clear()
@@ -0,0 +1,73 @@
+"""Login session persistence, shared between processes.
+
+The session cookie is stored as JSON, readable only by the owner, so
+other processes can reuse it rather than logging in again. Set the path
+to "0" to disable.
+"""
+
+
+import io
+import os
+import json
+
+from .logger import log
+
+
+def load_session(path: str, username: str, newer_than: float) -> dict:
+    """Load a stored session, if fresh enough.
+
+    Args::
+
+        path: stored session path, "0" to disable
+        username: only use sessions of this user, if given
+        newer_than: timestamp the session must be newer than
+
+    Returns:
+        dictionary of username, cookie, last (login timestamp) and custid,
+        or None if there is no usable session
+    """
+
+    if path == "0" or not os.path.isfile(path):
+        return None
+
+    try:
+        with io.open(path, "r", encoding="utf-8") as open_file:
+            session = json.load(open_file)
+    except Exception as error:
+        log.warning("Failed to read session %s: %r", path, error)
+        return None
+
+    if username and session.get("username") != username:
+        return None
+
+    if not session.get("cookie") or session.get("last", 0) <= newer_than:
+        return None
+
+    return session
+
+
+def store_session(path: str, session: dict) -> None:
+    """Persist the session for other processes (mode 0600).
+
+    Args::
+
+        path: stored session path, "0" to disable
+        session: dictionary of username, cookie, last and custid
+    """
+
+    if path == "0" or not session.get("cookie"):
+        return
+
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        descriptor = os.open(
+            tmp_path,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o600,
+        )
+        with io.open(descriptor, "w", encoding="utf-8") as open_file:
+            json.dump(session, open_file)
+        os.replace(tmp_path, path)
+    except Exception as error:
+        log.warning("Failed to store session %s: %r", path, error)
@@ -0,0 +1,191 @@
+"""Pooled HTTP transport and rate limiting shared by all stats clients."""
+
+
+import os
+import time
+import atexit
+import threading
+
+from requests import Session
+from requests import Request
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import Timeout
+from requests.exceptions import ConnectionError  # pylint: disable=W0622
+
+from .logger import log
+from .limiter import RateLimiter
+from .limiter import backoff_delay
+from .limiter import parse_retry_after
+from .metrics import Metrics
+from .constants import Priority
+
+
+class Cancelled(RuntimeError):
+    """Raised when a request is abandoned by its caller."""
+
+
+class _Client:
+    """Static client to manage the connection pool and rate limiter."""
+
+    _session = None
+    _limiter = None
+    _lock = threading.Lock()
+
+    # per thread request context (abort event, priority lane)
+    local = threading.local()
+
+    # per endpoint request telemetry
+    telemetry = Metrics()
+
+    # seconds to wait for iRacing to respond to a single request
+    timeout = float(os.getenv("IRACE_TIMEOUT") or 60)
+    # retries for connection errors, timeouts and retryable statuses
+    retries = int(os.getenv("IRACE_RETRIES") or 3)
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    @staticmethod
+    def _new_limiter() -> RateLimiter:
+        """Create a rate limiter configured from the environment."""
+
+        return RateLimiter(
+            rate=float(os.getenv("IRACE_RATE") or 10),
+            burst=int(os.getenv("IRACE_BURST") or 10),
+            max_in_flight=int(os.getenv("IRACE_MAX_IN_FLIGHT") or 4),
+            max_rate=float(os.getenv("IRACE_MAX_RATE") or 0) or None,
+        )
+
+    @staticmethod
+    def _get() -> Session:
+        """Return and/or create the static HTTP session and rate limiter."""
+
+        with _Client._lock:
+            if _Client._session is None:
+                # keep a limiter which still has requests waiting on it
+                if _Client._limiter is None or _Client._limiter.idle:
+                    _Client._limiter = _Client._new_limiter()
+
+                session = Session()
+                adapter = HTTPAdapter(
+                    pool_maxsize=_Client._limiter.max_in_flight,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _Client._session = session
+
+                atexit.register(_Client.app_exit)
+
+        return _Client._session
+
+    @staticmethod
+    def limiter() -> RateLimiter:
+        """Return the shared rate limiter."""
+
+        _Client._get()
+        return _Client._limiter
+
+    @staticmethod
+    def priority() -> int:
+        """Return the priority lane for requests from this thread."""
+
+        return getattr(_Client.local, "priority", Priority.DEFAULT)
+
+    @staticmethod
+    def send_request(request: Request, priority: int = None) -> Response:
+        """Sends a request using our connection pool and rate limiter.
+
+        Connection errors, timeouts and retryable statuses are retried with
+        jittered exponential backoff, honouring any Retry-After header.
+        """
+
+        session = _Client._get()
+        limiter = _Client._limiter
+        prepared = session.prepare_request(request)
+        abort = getattr(_Client.local, "abort", None)
+        if priority is None:
+            priority = _Client.priority()
+
+        attempt = 0
+        while True:
+            queued = time.monotonic()
+            if not limiter.acquire(abort=abort, priority=priority):
+                raise Cancelled("Request cancelled: {}".format(
+                    prepared.url,
+                ))
+            sent = time.monotonic()
+            status = None
+            wait = None
+            try:
+                response = session.send(prepared, timeout=_Client.timeout)
+            except (ConnectionError, Timeout) as error:
+                _Client.telemetry.record(
+                    prepared.url,
+                    wait=sent - queued,
+                    retry=attempt > 0,
+                )
+                if attempt >= _Client.retries:
+                    raise
+                log.warning("Request to %s failed: %r", prepared.url, error)
+            else:
+                status = response.status_code
+                _Client.telemetry.record(
+                    prepared.url,
+                    status=status,
+                    size=len(response.content),
+                    latency=response.elapsed.total_seconds(),
+                    wait=sent - queued,
+                    retry=attempt > 0,
+                )
+                wait = parse_retry_after(
+                    response.headers.get("Retry-After"),
+                )
+                if (status not in _Client.retry_statuses or
+                        attempt >= _Client.retries):
+                    return response
+                log.warning(
+                    "Request to %s returned %d, retrying",
+                    prepared.url,
+                    status,
+                )
+            finally:
+                limiter.release(status, wait)
+
+            delay = backoff_delay(attempt, minimum=wait)
+            if abort is None:
+                time.sleep(delay)
+            elif abort.wait(delay):
+                raise Cancelled("Request cancelled: {}".format(
+                    prepared.url,
+                ))
+            attempt += 1
+
+    @staticmethod
+    def wake() -> None:
+        """Wake any requests waiting on the rate limiter."""
+
+        if _Client._limiter is not None:
+            _Client._limiter.wake()
+
+    @staticmethod
+    def metrics() -> dict:
+        """Return a snapshot of the rate limiter state and telemetry."""
+
+        limiter = _Client._limiter
+        return {
+            "limiter": limiter.metrics() if limiter is not None else {},
+            "endpoints": _Client.telemetry.snapshot(),
+        }
+
+    @staticmethod
+    def app_exit():
+        """Exit function to clean up the HTTP session.
+
+        The rate limiter is kept for the metrics emitted at exit, it is
+        replaced along with the session if another request is made and
+        nothing is still waiting on it.
+        """
+
+        with _Client._lock:
+            if _Client._session is not None:
+                _Client._session.close()
+                _Client._session = None
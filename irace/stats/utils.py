@@ -1,11 +1,16 @@
 """Stats module utilities."""
 
 
+import re
 import json
 import time
 
 from datetime import datetime
+from collections import deque
+from collections.abc import Mapping
 from functools import wraps
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import unquote_plus
 
 from .logger import log
@@ -29,15 +34,154 @@ def untested(func):  # XXX remove me!
     return _untested
 
 
-def format_results(results, header) -> list:
-    """Re-arrange the results into a more manageable data structure."""
+class Row(Mapping):
+    """Read only dict view of a single `Table` row."""
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict, values: tuple):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Table:
+    """Compact decoding of an iRacing {"m": header, "d": rows} response.
+
+    Column names are stored once and each row is a tuple. Indexing or
+    iterating returns `Row` dict views, so callers expecting the list of
+    dicts from `format_results` keep working.
+    """
+
+    __slots__ = ("columns", "rows", "_index")
+
+    def __init__(self, columns: tuple, rows: list):
+        self.columns = tuple(columns)
+        self.rows = rows
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    @classmethod
+    def from_results(cls, results: list, header: dict,
+                     columns: tuple = None):
+        """Build the table from the raw rows and header mapping.
+
+        Args::
+
+            results: list of row dictionaries, keyed by header keys
+            header: mapping of header key to column name
+            columns: optional column names to keep, all if not provided,
+                     names not in the header are skipped
+        """
+
+        if columns is None:
+            keys = tuple(header)
+        else:
+            by_name = {v: k for k, v in header.items()}
+            keys = tuple(by_name[name] for name in columns if name in by_name)
+
+        return cls(
+            [header[k] for k in keys],
+            [tuple(row.get(k) for k in keys) for row in results],
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for row in self.rows:
+            yield Row(self._index, row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Table(self.columns, self.rows[index])
+        return Row(self._index, self.rows[index])
+
+    def column(self, name: str) -> list:
+        """Return all values for the column."""
+
+        i = self._index[name]
+        return [row[i] for row in self.rows]
+
+    def to_dicts(self) -> list:
+        """Return the rows as a list of dictionaries."""
+
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def format_strings(self) -> None:
+        """Decode all string values in the table."""
+
+        self.rows = [tuple(
+            unquote(v) if isinstance(v, str) else v for v in row
+        ) for row in self.rows]
+
+
+def format_results(results, header, columns: tuple = None,
+                   compact: bool = False):
+    """Re-arrange the results into a more manageable data structure.
+
+    Args::
+
+        results: list of row dictionaries, keyed by header keys
+        header: mapping of header key to column name
+        columns: optional column names to keep, all if not provided,
+                 names not in the header are skipped
+        compact: return a `Table` rather than a list of dictionaries
+    """
+
+    if compact:
+        return Table.from_results(results, header, columns)
+
+    if columns is not None:
+        keys = {k for k, v in header.items() if v in columns}
+        return [
+            {header[k]: v for k, v in row.items() if k in keys}
+            for row in results
+        ]
 
     return [{header[k]: v for k, v in row.items()} for row in results]
 
 
+# keys only ever holding numeric values, skipped by format_strings
+NUMERIC_KEYS = frozenset((
+    "lapData",  # session_laps, can be thousands of entries
+))
+
+
+@lru_cache(maxsize=8192)
+def _unquote(value: str) -> str:
+    """Undo the double plus encoding, memoized for repeated values."""
+
+    return unquote_plus(unquote_plus(value))
+
+
+def unquote(value: str) -> str:
+    """Decode an iRacing string value."""
+
+    # iRacing.com double plus encodes their strings...
+    # so um. just... go ahead and double undo that here
+    if "%" in value or "+" in value:
+        return _unquote(value)
+    return value
+
+
 def format_strings(results: dict) -> None:
     """Blindly clean all string values in the dictionary (recursive)."""
 
+    if isinstance(results, Table):
+        results.format_strings()
+        return
+
     if isinstance(results, (list, tuple)):
         for result in results:
             format_strings(result)
@@ -45,9 +189,9 @@ def format_strings(results: dict) -> None:
 
     for key, value in results.items():
         if isinstance(value, str):
-            # iRacing.com double plus encodes their strings...
-            # so um. just... go ahead and double undo that here
-            results[key] = unquote_plus(unquote_plus(results[key]))
+            results[key] = unquote(value)
+        elif key in NUMERIC_KEYS:
+            continue
         elif isinstance(value, (list, tuple)):
             for nested in value:
                 format_strings(nested)
@@ -87,6 +231,46 @@ def get_irservice_var(key, resp, appear=1):
     return {x["id"]: x for x in loaded}
 
 
+_IRSERVICE_VAR = re.compile(r"var (\w+) = extractJSON\('")
+
+
+def get_irservice_vars(keys, resp) -> dict:
+    """Parse the values for all keys from the text response in one pass.
+
+    Keys not found in the response, or which fail to parse, are missing
+    from the return. Only the first appearance of each key is used.
+    """
+
+    found = {}
+    failed = set()
+    for match in _IRSERVICE_VAR.finditer(resp):
+        key = match.group(1)
+        if key not in keys or key in found or key in failed:
+            continue
+
+        try:
+            loaded = json.loads(
+                resp[match.end(): resp.index("');", match.end())].replace(
+                    "+",
+                    " ",
+                )
+            )
+
+            if key in ("SeasonListing", "YearAndQuarterListing"):
+                found[key] = loaded
+            else:
+                found[key] = {x["id"]: x for x in loaded}
+        except (ValueError, KeyError, TypeError) as error:
+            log.warning("Failed to parse %s: %r", key, error)
+            failed.add(key)
+            continue
+
+        if len(found) + len(failed) == len(keys):
+            break
+
+    return found
+
+
 def as_timestamp(time_string):
     """Convert the time string into a timestamp."""
 
@@ -95,6 +279,69 @@ def as_timestamp(time_string):
     ) * 1000
 
 
+def page_count(total_results: int) -> int:
+    """Return the number of pages needed for the total number of results."""
+
+    return -(-int(total_results) // Pages.NUM_ENTRIES)
+
+
+def iter_pages(fetch, window: int = 4):
+    """Yield all rows from a paginated endpoint, prefetching pages.
+
+    Args::
+
+        fetch: callable of page number to a tuple of (rows, last_page),
+               last_page may be None if unknown
+        window: maximum number of pages to fetch concurrently
+
+    The first page is fetched alone. Then up to `window` following pages
+    are requested at once (bounded by last_page, if known), and rows are
+    yielded in page order. Iteration stops at the first short page.
+
+    Without a last_page, no more pages are requested ahead than have been
+    returned full, so small results don't fetch a window of empty pages.
+    """
+
+    rows, last_page = fetch(1)
+    yield from rows
+
+    if len(rows) < Pages.NUM_ENTRIES or (
+            last_page is not None and last_page <= 1):
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, window),
+        thread_name_prefix="irace-pages",
+    )
+    pending = deque()
+    next_page = 2
+    full_pages = 1
+
+    try:
+        while True:
+            ahead = max(1, window)
+            if last_page is None:
+                ahead = min(ahead, full_pages)
+            while len(pending) < ahead and (
+                    last_page is None or next_page <= last_page):
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+
+            if not pending:
+                return
+
+            rows, _ = pending.popleft().result()
+            yield from rows
+
+            if len(rows) < Pages.NUM_ENTRIES:
+                return
+            full_pages += 1
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
 def page_bounds(page: int = 1) -> (int, int):
     """Return the lower and upper bounds given the page number."""
 
@@ -27,6 +27,7 @@ import os
 import json
 from enum import Enum
 from glob import glob
+from types import SimpleNamespace
 from collections import namedtuple
 
 from .stats.logger import log
@@ -35,7 +36,7 @@ try:
     import couchdb
     _DB_EXTRAS = True
 except ImportError:
-    couchdb = object()
+    couchdb = SimpleNamespace(Server=object)  # for type hints only
     _DB_EXTRAS = False
     log.warning("irace[db] extras not installed, falling back to flat files")
 
@@ -57,6 +58,8 @@ class Databases(Enum):
     races = Database("races", ("league", "season"), "race")
     seasons = Database("seasons", ("league",), "season")
     admin = Database("admin", (), "system")
+    # parsed car/track/season listings, see irace.catalog
+    catalog = Database("catalog", (), "listing")
 
     # -- processing JSON --
     # partial results per league for each driver
@@ -71,6 +74,8 @@ class Databases(Enum):
     p_seasons = Database("p_seasons", ("league",), "name")
     # race level JSON (<race_id>.json)
     p_races = Database("p_races", ("league", "season"), "name")
+    # per driver laps of a race (<driver_id>.json), with --lap-files
+    p_laps = Database("p_laps", ("league", "season", "race"), "name")
 
 
 def get_server() -> couchdb.Server:
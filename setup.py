@@ -44,7 +44,6 @@ setup(
     packages=find_packages(exclude=["test"]),
     python_requires=">= 3.7.4",
     install_requires=[
-        "RequestsThrottler >= 0.2.5",
         "requests >= 2.2.0",
         "docopt >= 0.6.1",
     ],
@@ -0,0 +1,39 @@
+"""Shared test fixtures."""
+
+
+import os
+import sys
+
+import pytest
+
+from irace import storage
+
+# the synthetic league history is shared with the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "bench"))
+import synthetic  # noqa: E402 pylint: disable=wrong-import-position
+
+
+@pytest.fixture(name="results")
+def _results(tmp_path, monkeypatch):
+    """Store a small synthetic league history, return its path.
+
+    Two leagues sharing half of their members, with multiclass races.
+    Worker processes find the storage through IRACE_RESULTS.
+    """
+
+    path = str(tmp_path / "results")
+    server = storage.FileServer(path)
+    synthetic.populate_storage(
+        server,
+        leagues=2,
+        seasons=2,
+        races=3,
+        drivers=12,
+        field=8,
+        laps=5,
+        classes=2,
+    )
+
+    monkeypatch.setenv("IRACE_RESULTS", path)
+    monkeypatch.setattr(storage.Server, "_Server__impl", server, raising=False)
+    return path
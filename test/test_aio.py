@@ -0,0 +1,203 @@
+"""Tests for the asyncio stats client."""
+
+
+import time
+import asyncio
+import threading
+
+import pytest
+from requests import Response
+
+from irace.stats.aio import ThreadedAsyncStats
+from irace.stats.client import Stats
+from irace.stats.transport import _Client
+from irace.stats.constants import Priority
+from irace.stats.limiter import RateLimiter
+
+
+class _Session:
+    """Stand in for the requests Session, recording what is sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    @staticmethod
+    def prepare_request(request):
+        """Prepare the request, as a Session would."""
+
+        return request.prepare()
+
+    def send(self, prepared, timeout=None):  # pylint: disable=W0613
+        """Record the request and its lane, return an empty laps list."""
+
+        self.sent.append((prepared.body, _Client.priority()))
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"lapData": []}'  # pylint: disable=W0212
+        response.request = prepared
+        return response
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+
+@pytest.fixture(name="client")
+def _client(monkeypatch):
+    """Return a ThreadedAsyncStats, its stubbed session and limiter."""
+
+    monkeypatch.setenv("IRACE_SESSION", "0")
+    session = _Session()
+    limiter = RateLimiter(rate=1000, burst=100, max_in_flight=1)
+    monkeypatch.setattr(_Client, "_session", session)
+    monkeypatch.setattr(_Client, "_limiter", limiter)
+
+    stats = Stats()
+    stats._Stats__auth["last"] = time.time()  # pylint: disable=W0212
+    client = ThreadedAsyncStats(stats, priority=Priority.BACKFILL)
+    yield client, session, limiter
+    client._executor.shutdown(wait=True)  # pylint: disable=W0212
+    del stats  # only collected once the workers are done with it
+
+
+def _wait_queued(limiter: RateLimiter, count: int) -> None:
+    """Wait for count requests to queue on the limiter."""
+
+    deadline = time.monotonic() + 5
+    while limiter.queued < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_gather_in_lane(client):
+    """Fanned out calls all complete, in the client's priority lane."""
+
+    aio, session, _ = client
+
+    async def _main():
+        return await asyncio.gather(*(
+            aio.session_laps(x, 1) for x in range(5)
+        ))
+
+    assert asyncio.run(_main()) == [{"lapData": []}] * 5
+    assert len(session.sent) == 5
+    assert {lane for _, lane in session.sent} == {Priority.BACKFILL}
+    assert threading.current_thread().name not in {
+        x.name for x in threading.enumerate() if x.name.startswith("irace-")
+    }
+
+
+def test_async_iterators(client):
+    """Paginated endpoints are async generators, pages come in order."""
+
+    aio, _, _ = client
+    requested = []
+
+    def _members(league_id, page=1):  # pylint: disable=unused-argument
+        requested.append(page)
+        return [{"custID": x} for x in range(
+            (page - 1) * 25 + 1,
+            min(page * 25, 60) + 1,
+        )]
+
+    aio.stats._league_members = _members  # pylint: disable=W0212
+
+    async def _main():
+        members = [x["custID"] async for x in aio.iter_league_members(1)]
+        async for _ in aio.iter_league_members(1):
+            break
+        return members
+
+    assert asyncio.run(_main()) == list(range(1, 61))
+    assert {1, 2, 3} <= set(requested)
+    assert all(
+        hasattr(aio, name) for name in dir(Stats)
+        if name.startswith("iter_")
+    )
+
+
+def test_iterator_abort_reaches_prefetch(client):
+    """Prefetched pages share the iterator's abort event, set on exit."""
+
+    aio, _, _ = client
+    aborts = {}
+
+    def _members(league_id, page=1):  # pylint: disable=unused-argument
+        aborts[page] = _Client.local.abort
+        return [{"custID": x} for x in range(25)]
+
+    aio.stats._league_members = _members  # pylint: disable=W0212
+
+    async def _main():
+        pages = aio.iter_league_members(1)
+        async for _ in pages:
+            if len(aborts) > 2:
+                break
+        await pages.aclose()
+
+    asyncio.run(_main())
+    assert len(aborts) > 2
+    assert len({id(x) for x in aborts.values()}) == 1
+    assert aborts[1].is_set()
+
+
+def test_timeout_abandons_queued(client):
+    """A timed out call waiting on the limiter is never sent."""
+
+    aio, session, limiter = client
+    assert limiter.acquire(timeout=0)  # hold the only slot
+
+    async def _main():
+        await aio.session_laps(1, 1, timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_main())
+
+    aio._executor.shutdown(wait=True)  # pylint: disable=protected-access
+    limiter.release(200)
+    assert limiter.queued == 0
+    assert not session.sent
+
+
+def test_cancelled_gather(client):
+    """Cancelling a gather releases all of its waiters."""
+
+    aio, session, limiter = client
+    assert limiter.acquire(timeout=0)  # hold the only slot
+
+    async def _main():
+        task = asyncio.ensure_future(asyncio.gather(*(
+            aio.session_laps(x, 1) for x in range(4)
+        )))
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            _wait_queued,
+            limiter,
+            4,
+        )
+        assert limiter.queued == 4
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(_main())
+
+    aio._executor.shutdown(wait=True)  # pylint: disable=protected-access
+    limiter.release(200)
+    assert limiter.queued == 0
+    assert not session.sent
+
+
+def test_reset_keeps_busy_limiter(client):
+    """Resetting the session keeps a limiter which is still in use."""
+
+    _, _, limiter = client
+    assert limiter.acquire(timeout=0)
+
+    _Client.app_exit()
+    _Client._get()  # pylint: disable=protected-access
+    assert _Client.limiter() is limiter
+
+    limiter.release(200)
+    _Client.app_exit()
+    _Client._get()  # pylint: disable=protected-access
+    assert _Client.limiter() is not limiter
+    _Client.app_exit()
@@ -0,0 +1,75 @@
+"""Tests for the persistent car/track catalog."""
+
+
+import time
+import threading
+
+from irace import catalog
+from irace.storage import Databases
+from irace.storage import FileServer
+
+
+class _Client:
+    """Stand in for `stats.Client`, counting logins."""
+
+    def __init__(self):
+        self.cache = {}
+        self.logins = 0
+
+    @staticmethod
+    def has_credentials() -> bool:
+        """Always have credentials."""
+
+        return True
+
+    def login(self, force: bool = False) -> None:  # pylint: disable=W0613
+        """Fill the cache, as parsed from iRacing."""
+
+        self.logins += 1
+        self.cache.update({key: {1: {"id": 1}} for key in catalog.LISTINGS})
+        self.cache.update({key: None for key in catalog.OTHERS})
+        self.cache["__populated"] = True
+
+
+def test_reused_within_ttl(tmp_path, monkeypatch):
+    """The stored catalog is used inside the TTL and refetched after it."""
+
+    client = _Client()
+    server = FileServer(str(tmp_path))
+    monkeypatch.setattr(catalog, "Client", client)
+    monkeypatch.setattr(catalog, "Server", server)
+
+    assert catalog.load()
+    assert client.logins == 1
+
+    client.cache.clear()
+    assert catalog.load()
+    assert client.logins == 1
+    assert client.cache["cars"] == {1: {"id": 1}}
+
+    stored = server.read(Databases.catalog, (), "cache")
+    stored["updated"] = time.time() - catalog.TTL - 1
+    server.write(Databases.catalog, (), "cache", stored)
+
+    client.cache.clear()
+    assert catalog.load()
+    assert client.logins == 2
+
+
+def test_installed_in_workers(tmp_path, monkeypatch):
+    """Workers use the parent's catalog, never loading it themselves."""
+
+    parent = _Client()
+    monkeypatch.setattr(catalog, "Client", parent)
+    monkeypatch.setattr(catalog, "Server", FileServer(str(tmp_path)))
+    assert catalog.snapshot() == {}
+    assert catalog.load()
+    items = catalog.snapshot()
+    assert items["cars"] == {1: {"id": 1}}
+
+    worker = _Client()
+    monkeypatch.setattr(catalog, "Client", worker)
+    monkeypatch.setattr(catalog, "_ATTEMPTED", threading.Event())
+    catalog.install(items)
+    assert catalog.get("cars") == {1: {"id": 1}}
+    assert worker.logins == 0
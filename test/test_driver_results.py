@@ -0,0 +1,61 @@
+"""Tests for the driver results spilled to storage per league."""
+
+
+import json
+
+import pytest
+
+from irace import generate
+from irace.parse import Registry
+from irace.storage import Server
+from irace.storage import Databases
+
+
+def _in_memory(leagues: list, drivers: set) -> dict:
+    """Return all driver results accumulated in memory, every league."""
+
+    # pylint: disable=protected-access
+    results = {}
+    models = Registry()
+    for league in leagues:
+        for season in Server.read_all(
+                Databases.seasons,
+                (league["leagueid"],)):
+            season = generate._read_season(
+                league["leagueid"],
+                season,
+            )
+            for custid, result in generate._season_driver_results(
+                    season, league, drivers, models).items():
+                results.setdefault(custid, {}).setdefault(
+                    str(league["leagueid"]),
+                    [],
+                ).append(result)
+
+    # stored results are JSON with sorted keys
+    return json.loads(json.dumps(results, sort_keys=True))
+
+
+@pytest.mark.usefixtures("results")
+def test_spilled_match_in_memory(tmp_path):
+    """League at a time spilling keeps every league of every driver."""
+
+    leagues = Server.read_all(Databases.leagues)
+    drivers = {
+        x["custID"] for league in leagues
+        for x in Server.read_all(Databases.members, (league["leagueid"],))
+    }
+    args = {"--output": str(tmp_path / "dist")}
+    generate.write_templates(args)
+    assert not args["stats"].failures
+
+    # after generating, so both see the same car catalog
+    expected = _in_memory(leagues, drivers)
+
+    spilled = {
+        str(custid): generate.driver_results({"custID": custid})
+        for custid in drivers
+    }
+    spilled = {k: v for k, v in spilled.items() if v}
+    assert spilled == expected
+    assert any(len(x) > 1 for x in expected.values())
@@ -0,0 +1,65 @@
+"""Tests for generating with a pool of worker processes."""
+
+
+import os
+import sys
+
+import pytest
+
+from irace import generate
+from irace.storage import Server
+from irace.storage import Databases
+
+
+def _generate(output: str, jobs: int) -> tuple:
+    """Generate into output, return the written files and the counters."""
+
+    args = {"--output": output}
+    if jobs > 1:
+        generate.write_templates_parallel(args, jobs)
+    else:
+        generate.write_templates(args)
+
+    files = {}
+    for root, _, names in os.walk(output):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as open_file:
+                files[os.path.relpath(path, output)] = open_file.read()
+
+    assert not args["stats"].failures
+    return files, args["stats"].counters
+
+
+@pytest.mark.usefixtures("results")
+def test_jobs_match_in_process(tmp_path):
+    """Worker processes write the same files and counts as one process."""
+
+    in_process, counters = _generate(str(tmp_path / "one"), 1)
+    parallel, parallel_counters = _generate(str(tmp_path / "two"), 2)
+
+    assert len(in_process) > 30
+    assert any(x.startswith("drivers") for x in in_process)
+    assert parallel == in_process
+    assert parallel_counters == counters
+
+
+def test_worker_failure_reaches_main(results, tmp_path, monkeypatch):
+    """An exception in a worker process fails the command."""
+
+    season = Server.read_all(Databases.seasons, (1,))[0]
+    Server.write(
+        Databases.races,
+        (1, season["league_season_id"]),
+        1,
+        {"subsessionid": 1},
+    )
+
+    monkeypatch.setattr(sys, "argv", [
+        "irace-generate",
+        "--input={}".format(results),
+        "--output={}".format(tmp_path / "dist"),
+        "--jobs=2",
+    ])
+    with pytest.raises(SystemExit, match="Failed to process 1 item"):
+        generate.main()
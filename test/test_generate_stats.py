@@ -0,0 +1,74 @@
+"""Tests for the irace-generate progress accounting."""
+
+
+import pickle
+import threading
+
+from irace import output
+from irace import generate
+from irace.generate import Stats
+
+
+def test_concurrent_counts():
+    """Counters from many threads are all accounted for."""
+
+    stats = Stats(0)
+
+    def _worker():
+        for _ in range(1000):
+            stats.add()
+            stats.inc_written_to_file()
+            stats.inc()
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counters = stats.counters
+    assert counters["queued"] == 8000
+    assert counters["processed"] == 8000
+    assert counters["to_file"] == 8000
+
+
+def test_failures_survive_workers():
+    """Failures and counters are merged back from worker stats."""
+
+    worker = Stats(2)
+    worker.inc()
+    worker.fail("driver 1", ValueError("bad data"))
+    worker = pickle.loads(pickle.dumps(worker))
+
+    stats = Stats(0)
+    stats.consume(worker)
+    assert stats.counters["queued"] == 0
+    assert stats.counters["processed"] == 1
+
+    stats.consume(worker, queued=True)
+    assert stats.counters["queued"] == 2
+    assert stats.report() == 2
+    assert stats.failures[0] == ("driver 1", "ValueError('bad data')")
+
+
+def test_drivers_into_fresh_output(tmp_path, monkeypatch):
+    """The driver thread pool can create the output directories."""
+
+    # as if another thread always created the directory after our check
+    monkeypatch.setattr(generate.os.path, "exists", lambda path: False)
+    monkeypatch.setattr(generate, "driver_results", lambda driver: {
+        "1": [{
+            "results": [{"id": driver["custID"]}],
+            "season": {"season": {"id": 1}},
+        }],
+    })
+
+    for attempt in range(5):
+        args = {"--output": str(tmp_path / str(attempt)), "stats": Stats(0)}
+        output.open_manifest(args)
+        generate._write_drivers(args, [  # pylint: disable=protected-access
+            {"custID": x, "displayName": "Driver"} for x in range(200)
+        ])
+
+        assert not args["stats"].failures
+        assert args["stats"].counters["to_file"] == 200
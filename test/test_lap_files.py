@@ -0,0 +1,86 @@
+"""Tests for the lap file output of races."""
+
+
+import copy
+
+from irace.parse import Laps
+from irace.parse import Race
+
+
+def _laps(custid: int) -> Laps:
+    """Return Laps of three laps, the second invalid."""
+
+    return Laps({
+        "header": {"subsessionid": 5},
+        "drivers": [{
+            "custid": custid,
+            "displayname": "Driver",
+            "bestlaptime": 900000,
+            "bestlapnum": 2,
+        }],
+        "lapData": [
+            {"lap_num": 0, "flags": 0, "ses_time": 100000},
+            {"lap_num": 1, "flags": 1, "ses_time": 1100000},
+            {"lap_num": 2, "flags": 0, "ses_time": 2000000},
+        ],
+    })
+
+
+def test_lap_summary():
+    """Lap files carry the laps, statistics match the embedded summary."""
+
+    laps = _laps(7)
+    race = Race([laps], {
+        "subsessionid": 5,
+        "leagueid": 1,
+        "league_season_id": 2,
+        "start_time": "2020-06-01 19:00:00",
+        "rows": [],
+    })
+
+    summary = laps.summary
+    assert laps.statistics == {
+        k: v for k, v in summary.items() if k != "laps"
+    }
+    assert race.lap_summary(7) == {
+        "id": 5,
+        "driver_id": 7,
+        "laps": summary["laps"],
+    }
+    assert race.lap_summary(8) == {}
+    assert race.lap_file(7) == "1/2/5/7.json"
+
+
+def test_columnar_laps():
+    """Format 2 laps decode back to the format 1 times and flags."""
+
+    laps = _laps(7)
+    columns = laps.lap_list(2)
+
+    assert columns["lap"] == [0, 1, 2]
+    assert columns["flags"] == [0, 1, 0]
+
+    times = []
+    for delta in columns["time"]:
+        times.append(delta + (times[-1] if times else 0))
+    assert times == [x["time_int"] for x in laps.lap_list(1)]
+
+
+def test_memoized_driver_summary():
+    """Memoized driver summaries are unchanged by later summaries."""
+
+    race = Race([_laps(7)], {
+        "subsessionid": 5,
+        "leagueid": 1,
+        "league_season_id": 2,
+        "start_time": "2020-06-01 19:00:00",
+        "rows": [],
+    })
+
+    summary = race.driver_summary(7)
+    expected = copy.deepcopy(summary)
+
+    assert race.driver_summary(7, lap_list=False) != summary
+    race.lap_summary(7, 2)
+    assert race.driver_summary(7) is summary
+    assert summary == expected
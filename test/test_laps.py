@@ -0,0 +1,92 @@
+"""Tests for the array backed Laps."""
+
+
+import time
+import threading
+
+from irace.parse import Laps
+
+
+def _laps() -> Laps:
+    """Return Laps of four laps with a mix of flags."""
+
+    return Laps({
+        "header": {"subsessionid": 5},
+        "drivers": [{
+            "custid": 7,
+            "displayname": "Driver",
+            "bestlaptime": 900000,
+            "bestlapnum": 3,
+        }],
+        "lapData": [
+            {"lap_num": 0, "flags": 0, "ses_time": 100000},
+            {"lap_num": 1, "flags": 1 | 4096, "ses_time": 1100000},
+            {"lap_num": 2, "flags": 4096, "ses_time": 2050000},
+            {"lap_num": 3, "flags": 2 | 32, "ses_time": 2950000},
+        ],
+    })
+
+
+def test_aggregates_match_laps():
+    """Aggregates from the arrays match the Lap objects."""
+
+    laps = _laps()
+    assert laps.total_laps == 4
+    assert laps.valid_laps == 2
+    assert laps.total_valid_time == 95.0 + 90.0
+    assert laps.average == (95.0 + 90.0) / 2
+    assert laps.total_time == sum(
+        x.time.total_seconds() for x in laps.laps
+    )
+    assert laps.flagged_laps == {
+        1: ("invalid",),
+        3: ("pitted", "contact"),
+    }
+    assert [x.mask for x in laps.laps] == [0, 1, 0, 34]
+    assert laps.summary["laps"] == [x.summary for x in laps.laps]
+
+
+def test_lazy_parsing():
+    """The lap data is only parsed once a per lap property is used."""
+
+    laps = _laps()
+    assert laps.total_laps == 4
+    assert laps.driver_id == 7
+    assert laps.fastest_lap == 90.0
+    assert laps._arrays is None  # pylint: disable=protected-access
+
+    assert laps.valid_laps == 2
+    assert laps.total_laps == 4
+    assert laps._lap_data is None  # pylint: disable=protected-access
+
+
+class _SlowLapData(list):
+    """Lap data which counts and slows down its iterations."""
+
+    iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        time.sleep(0.05)  # let the other threads catch up
+        return super().__iter__()
+
+
+def test_shared_between_threads():
+    """Laps shared between threads are parsed once, with no errors."""
+
+    # pylint: disable=protected-access
+    lap_data = _SlowLapData(_laps()._lap_data)
+    laps = Laps({"header": {}, "drivers": [], "lapData": lap_data})
+    results = []
+
+    def _worker():
+        results.append((laps.valid_laps, laps.total_laps))
+
+    threads = [threading.Thread(target=_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [(2, 4)] * 4
+    assert lap_data.iterations == 1
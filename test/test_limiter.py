@@ -0,0 +1,109 @@
+"""Tests for the adaptive rate limiter."""
+
+
+import time
+import threading
+
+import pytest
+
+from irace.stats.limiter import RateLimiter
+from irace.stats.limiter import parse_retry_after
+
+
+def test_burst_then_timeout():
+    """Tokens are handed out up to the burst, then acquire times out."""
+
+    limiter = RateLimiter(rate=1, burst=2, max_in_flight=10)
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+    assert limiter.in_flight == 2
+    assert limiter.queued == 0
+
+
+def test_max_in_flight():
+    """Requests beyond max_in_flight wait for a release."""
+
+    limiter = RateLimiter(rate=100, burst=10, max_in_flight=1)
+
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+    limiter.release(200)
+    assert limiter.acquire(timeout=0.1)
+
+
+def test_pushback_and_recovery():
+    """The rate halves on a 429 and recovers after healthy responses."""
+
+    limiter = RateLimiter(rate=10, max_rate=10, healthy=2)
+
+    limiter.acquire()
+    limiter.release(429, retry_after=0.05)
+    assert limiter.rate == 5
+    assert limiter.metrics()["paused"] > 0
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.05
+
+    limiter.release(200)
+    limiter.acquire()
+    limiter.release(200)
+    assert limiter.rate == 5.5
+
+
+def test_parse_retry_after():
+    """Retry-After may be given in seconds or as an HTTP date."""
+
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_priority_lanes():
+    """Waiting lanes are served by weight, not arrival order."""
+
+    limiter = RateLimiter(
+        rate=1000,
+        burst=1,
+        max_in_flight=1,
+        weights={0: 3, 1: 1},
+    )
+    assert limiter.acquire()
+
+    order = []
+
+    def _worker(lane):
+        limiter.acquire(priority=lane)
+        order.append(lane)
+        limiter.release(200)
+
+    threads = [threading.Thread(target=_worker, args=(1,)) for _ in range(4)]
+    threads += [threading.Thread(target=_worker, args=(0,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while limiter.queued < len(threads):
+        time.sleep(0.001)
+
+    limiter.release(200)
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 0, 0, 1, 0, 1, 1, 1]
+
+
+def test_custom_lanes_default():
+    """Unknown lanes use the heaviest lane when there's no default lane."""
+
+    limiter = RateLimiter(rate=1, burst=2, weights={5: 1, 7: 2})
+    assert limiter.default == 7
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0, priority=9)
+    assert not limiter.acquire(timeout=0.01)
+    assert limiter.in_flight == 2
+
+    with pytest.raises(ValueError):
+        RateLimiter(weights={1: 0})
@@ -0,0 +1,43 @@
+"""Tests for the output directory manifest."""
+
+
+import os
+import gzip
+
+from irace.manifest import Manifest
+
+
+def test_unchanged_and_pruned(tmp_path):
+    """Unchanged files are skipped and files no longer written pruned."""
+
+    root = str(tmp_path)
+    manifest = Manifest(root)
+    assert manifest.write("a.json", "{}")
+    assert manifest.write(os.path.join("sub", "b.json"), "[]")
+    assert manifest.prune() == 0
+    manifest.save()
+
+    manifest = Manifest(root)
+    assert not manifest.write("a.json", "{}")
+    assert manifest.write("c.json", "[1]")
+    assert manifest.prune() == 1
+    manifest.save()
+
+    assert sorted(os.listdir(root)) == [".manifest.json", "a.json", "c.json"]
+
+
+def test_gzip_siblings(tmp_path):
+    """Compressed copies are written, and removed when disabled."""
+
+    root = str(tmp_path)
+    manifest = Manifest(root, compress=True)
+    manifest.write("a.json", "{\"a\":1}")
+    manifest.save()
+
+    with gzip.open(os.path.join(root, "a.json.gz"), "rt") as open_file:
+        assert open_file.read() == "{\"a\":1}"
+
+    # turning compression off rewrites everything without the siblings
+    manifest = Manifest(root)
+    assert manifest.write("a.json", "{\"a\":1}")
+    assert not os.path.exists(os.path.join(root, "a.json.gz"))
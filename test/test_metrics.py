@@ -0,0 +1,102 @@
+"""Tests for the per endpoint request telemetry."""
+
+
+from datetime import timedelta
+
+import pytest
+from requests import Request
+from requests import Response
+from requests.exceptions import ConnectionError  # pylint: disable=W0622
+
+from irace.stats.transport import _Client
+from irace.stats.constants import URLs
+from irace.stats.limiter import RateLimiter
+from irace.stats.metrics import Metrics
+from irace.stats.metrics import endpoint
+
+
+def _response(status: int, content: bytes = b"") -> Response:
+    """Return a response with the status and body."""
+
+    response = Response()
+    response.status_code = status
+    response._content = content  # pylint: disable=protected-access
+    response.elapsed = timedelta(seconds=0.25)
+    return response
+
+
+class _Session:
+    """Stand in for the requests Session, replaying outcomes by URL."""
+
+    def __init__(self, outcomes: dict):
+        self.outcomes = outcomes
+
+    @staticmethod
+    def prepare_request(request: Request):
+        """Prepare the request, as a Session would."""
+
+        return request.prepare()
+
+    def send(self, prepared, timeout=None):  # pylint: disable=W0613
+        """Return or raise the next outcome for the URL."""
+
+        outcome = self.outcomes[prepared.url].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+
+def test_endpoint():
+    """Endpoint names drop the base URL and query."""
+
+    assert endpoint(
+        URLs.BASE + "/memberstats/member/GetDriverStatus?custid=1"
+    ) == "memberstats/member/GetDriverStatus"
+
+
+def test_send_request_recorded(monkeypatch):
+    """Requests, statuses, bytes, retries and errors are per endpoint."""
+
+    ok_url = URLs.BASE + "/membersite/member/GetLeague"
+    retry_url = URLs.BASE + "/membersite/member/GetSeasons"
+    error_url = URLs.BASE + "/membersite/member/GetMembers"
+
+    monkeypatch.setattr(_Client, "_session", _Session({
+        ok_url: [_response(200, b"abc")],
+        retry_url: [_response(503), _response(200, b"12345")],
+        error_url: [ConnectionError("reset"), ConnectionError("reset")],
+    }))
+    monkeypatch.setattr(_Client, "_limiter", RateLimiter(rate=1000))
+    monkeypatch.setattr(_Client, "telemetry", Metrics())
+    monkeypatch.setattr(_Client, "retries", 1)
+    monkeypatch.setattr(
+        "irace.stats.transport.backoff_delay",
+        lambda *_, **__: 0,
+    )
+
+    for url in (ok_url, retry_url):
+        assert _Client.send_request(Request("GET", url)).status_code == 200
+    with pytest.raises(ConnectionError):
+        _Client.send_request(Request("GET", error_url))
+
+    snapshot = _Client.telemetry.snapshot()
+    ok = snapshot["membersite/member/GetLeague"]
+    assert (ok["requests"], ok["retries"], ok["errors"]) == (1, 0, 0)
+    assert (ok["bytes"], ok["status"]) == (3, {"200": 1})
+    assert ok["latency"]["total"] == 0.25
+
+    retried = snapshot["membersite/member/GetSeasons"]
+    assert (retried["requests"], retried["retries"]) == (2, 1)
+    assert (retried["bytes"], retried["errors"]) == (5, 0)
+    assert retried["status"] == {"200": 1, "503": 1}
+
+    failed = snapshot["membersite/member/GetMembers"]
+    assert (failed["requests"], failed["retries"]) == (2, 1)
+    assert (failed["errors"], failed["status"]) == (2, {})
+
+    # the exit snapshot still has the limiter after the session is closed
+    _Client.app_exit()
+    assert _Client.metrics()["limiter"]
@@ -0,0 +1,78 @@
+"""Tests for the streamed JSON output."""
+
+
+import json
+
+import pytest
+
+from irace.output import CHUNK_SIZE
+from irace.output import iter_json
+
+
+def _dumps(content: object) -> str:
+    """Return the reference encoding of content."""
+
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+
+
+def _race_page(drivers: int = 60, laps: int = 300) -> dict:
+    """Return a race page shaped like `Season.race_summary` output."""
+
+    return {
+        "league": {"id": 1, "name": "Café Racing League"},
+        "season": {"id": 2, "name": "Season 2", "points": "50,45,40"},
+        "race": {
+            "id": 3,
+            "time": "2020-06-01T19:00:00Z",
+            "track": "Circuit de Spa-Francorchamps",
+            "config": "Grand Prix Pits",
+            "drivers": drivers,
+            "laps": laps,
+            "results": [{
+                "id": custid,
+                "name": "Driver {} O'Test".format(custid),
+                "club": "New England",
+                "car": 100 + custid % 5,
+                "class": "GT3",
+                "position": custid,
+                "points": max(0, 50 - custid),
+                "incidents": custid % 12,
+                "average": 93.456,
+                "best": 91.234,
+                "laps": [{
+                    "lap": lap,
+                    "time": 92.5 + lap % 7 / 10,
+                    "flags": ["pitted"] if lap % 40 == 0 else [],
+                    "position": custid,
+                } for lap in range(laps)],
+            } for custid in range(1, drivers + 1)],
+        },
+    }
+
+
+@pytest.mark.parametrize("content", (
+    {"a": [{"b": {"c": [1, 2.5, None, True]}}], "d": "é\"\\"},
+    [1, 2, 3],
+    {"short": ["x", "y"], "empty": [], "none": {}},
+    {1: "one", 2: ["two"] * 100, None: {"nested": list(range(100))}},
+    ([{"k": i} for i in range(50)], ("a", "b")),
+    [["small"], ["big"] * 500, ["small"]],
+    "just a string",
+    [],
+))
+def test_identical_to_dumps(content):
+    """Chunks join to the json.dumps output, streamed or not."""
+
+    assert "".join(iter_json(content)) == _dumps(content)
+    assert "".join(iter_json(content, chunk_size=16)) == _dumps(content)
+
+
+def test_race_page_chunks_bounded():
+    """A race page with fewer than 64 drivers is still streamed."""
+
+    page = _race_page()
+    chunks = list(iter_json(page))
+
+    assert "".join(chunks) == _dumps(page)
+    assert len(_dumps(page)) > 10 * CHUNK_SIZE
+    assert max(len(x) for x in chunks) <= 2 * CHUNK_SIZE
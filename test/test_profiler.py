@@ -0,0 +1,102 @@
+"""Tests for the per phase profiler."""
+
+
+import os
+import sys
+import json
+import cProfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from irace import profiler
+from irace.profiler import profiled
+
+
+def _inner() -> int:
+    """Work in the inner phase."""
+
+    return sum(range(1000))
+
+
+def _outer() -> int:
+    """Work in the outer phase, calling the inner."""
+
+    return _inner() + sum(range(1000))
+
+
+def test_profiled(tmpdir):
+    """Phases are profiled, written and unpatched afterwards."""
+
+    module = sys.modules[__name__]
+    path = str(tmpdir.join("profile"))
+
+    with profiled(path, {
+            "outer": ((module, "_outer"),),
+            "inner": ((module, "_inner"),)}):
+        assert _outer() == 2 * sum(range(1000))
+        _outer()
+
+    assert _outer.__name__ == "_outer"
+    assert not hasattr(_outer, "__wrapped__")
+
+    with open(os.path.join(path, "profile.json")) as open_file:
+        summary = json.load(open_file)
+    assert summary["outer"]["calls"] == 2
+    assert summary["inner"]["calls"] == 2
+    assert summary["other"]["calls"] == 1
+
+    with open(os.path.join(path, "inner.collapsed")) as open_file:
+        stacks = open_file.read()
+    assert " (profiler.py:" not in stacks
+    assert os.path.isfile(os.path.join(path, "outer.pstats"))
+
+
+def test_disabled():
+    """Nothing is patched without a path."""
+
+    with profiled(None, {"outer": ((sys.modules[__name__], "_outer"),)}):
+        assert not hasattr(_outer, "__wrapped__")
+
+
+class _SingleProfile(cProfile.Profile):
+    """cProfile as from Python 3.12, only one may be enabled at a time."""
+
+    active = None
+    lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with self.lock:
+            if _SingleProfile.active not in (None, self):
+                raise ValueError("Another profiling tool is already active")
+            _SingleProfile.active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with self.lock:
+            if _SingleProfile.active is self:
+                _SingleProfile.active = None
+
+
+def test_profiled_threads(tmpdir, monkeypatch):
+    """Phases entered from worker threads are timed, not cProfiled."""
+
+    monkeypatch.setattr(profiler.cProfile, "Profile", _SingleProfile)
+    module = sys.modules[__name__]
+    path = str(tmpdir.join("profile"))
+    barrier = threading.Barrier(4)
+
+    def _work(_):
+        barrier.wait()
+        return _inner()
+
+    with profiled(path, {"inner": ((module, "_inner"),)}):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_work, range(8)))
+        _inner()
+
+    assert results == [sum(range(1000))] * 8
+    with open(os.path.join(path, "profile.json")) as open_file:
+        summary = json.load(open_file)
+    assert summary["inner"]["calls"] == 9
+    assert os.path.isfile(os.path.join(path, "inner.pstats"))
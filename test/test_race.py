@@ -0,0 +1,79 @@
+"""Tests for the indexed Race aggregates."""
+
+
+import pytest
+
+from irace.parse import Laps
+from irace.parse import Race
+from irace.stats import Client
+
+import synthetic  # from bench, see conftest.py
+
+
+@pytest.fixture(name="race")
+def _race(monkeypatch) -> Race:
+    """Return a three class race of 30 drivers, laps down at the back."""
+
+    monkeypatch.setitem(Client.cache, "cars", {})
+    monkeypatch.setitem(Client.cache, "__populated", True)
+    custids = list(range(100, 130))
+    return Race(
+        [Laps(synthetic.session_laps(7, x, 5)) for x in custids],
+        synthetic.session_results(7, custids, laps=5, classes=3),
+    )
+
+
+def _rows(race: Race, cls: str = None) -> list:
+    """Return the race session rows, of the class if given."""
+
+    return [
+        x for x in race.race["rows"]
+        if x["simsesname"] == "RACE" and cls in (None, x["ccNameShort"])
+    ]
+
+
+def test_class_aggregates(race):
+    """Class laps, counts and winners match recomputing from the rows."""
+
+    by_finish = sorted(_rows(race), key=lambda x: x["finishpos"])
+    classes = list(dict.fromkeys(x["ccNameShort"] for x in by_finish))
+
+    assert race.multiclass
+    assert list(race.classes) == classes
+    assert len(classes) == 3
+
+    laps = {c: max(x["lapscomplete"] for x in _rows(race, c)) for c in classes}
+    drivers = {c: len(_rows(race, c)) for c in classes}
+    assert race.class_laps_completed == laps
+    assert race.class_drivers == drivers
+    assert len(set(laps.values()) | set(drivers.values())) > 1
+
+    winners = []
+    for cls in classes:
+        winner = min(_rows(race, cls), key=lambda x: x["finishpos"])
+        winners.append({"id": winner["custid"], "name": winner["displayname"]})
+    assert list(race.class_winners) == winners
+
+    assert race.class_summary(include_winners=True) == [{
+        "name": cls,
+        "laps": laps[cls],
+        "drivers": drivers[cls],
+        "winner": winner,
+    } for cls, winner in zip(classes, winners)]
+
+
+def test_driver_class_summaries(race):
+    """Each driver's class details match recomputing from the rows."""
+
+    for row in _rows(race):
+        cls = row["ccNameShort"]
+        summary = race.driver_summary(row["custid"])
+
+        assert summary["finish"] == row["finishpos"] + 1
+        assert summary["drivers"] == len(_rows(race))
+        assert summary["class"]["name"] == cls
+        assert summary["class"]["finish"] == row["finishposinclass"] + 1
+        assert summary["class"]["laps"] == max(
+            x["lapscomplete"] for x in _rows(race, cls)
+        )
+        assert summary["class"]["drivers"] == len(_rows(race, cls))
@@ -0,0 +1,68 @@
+"""Tests for the parsed model registry."""
+
+
+from irace import generate
+from irace.parse import Registry
+
+
+def _race(subsessionid: int) -> dict:
+    """Return a minimal race and laps dictionary."""
+
+    return {
+        "laps": [],
+        "race": {
+            "subsessionid": subsessionid,
+            "start_time": "2020-06-01 19:00:00",
+            "rows": [],
+        },
+    }
+
+
+def test_models_are_shared():
+    """The same Race object is returned for the same subsessionid."""
+
+    models = Registry()
+    race = models.race(_race(1))
+    assert models.race(_race(1)) is race
+    assert models.race(_race(2)) is not race
+
+
+def test_shared_between_phases():
+    """Season pages and driver results parse each race once."""
+
+    models = Registry()
+    season = {
+        "season": {"league_season_id": 10},
+        "races": [_race(1), _race(2)],
+    }
+    league = {"leagueid": 1}
+
+    generate._write_season(  # pylint: disable=protected-access
+        {"stats": generate.Stats(0), "models": models},
+        season,
+        league,
+    )
+    assert (models.hits, models.misses) == (0, 2)
+
+    generate._season_driver_results(  # pylint: disable=protected-access
+        season,
+        league,
+        None,
+        models,
+    )
+    assert (models.hits, models.misses) == (2, 2)
+
+
+def test_bounded_eviction():
+    """The least recently used models are evicted first."""
+
+    models = Registry(max_races=2)
+    first = models.race(_race(1))
+    models.race(_race(2))
+    models.race(_race(1))
+    models.race(_race(3))
+
+    assert models.race(_race(1)) is first
+    assert models.misses == 3
+    models.race(_race(2))
+    assert models.misses == 4
@@ -0,0 +1,101 @@
+"""Tests for the indexed Season model."""
+
+
+import pytest
+
+from irace.parse import Laps
+from irace.parse import Race
+from irace.parse import Season
+from irace.stats import Client
+
+import synthetic  # from bench, see conftest.py
+
+
+LEAGUE = {"leagueid": 1, "leaguename": "League"}
+SEASON = {"league_season_id": 1, "league_season_name": "Season 1"}
+
+
+def _race(subsessionid: int, custids: list) -> Race:
+    """Return a synthetic two class Race of the drivers."""
+
+    return Race(
+        [Laps(synthetic.session_laps(subsessionid, x, 5)) for x in custids],
+        synthetic.session_results(subsessionid, custids, laps=5, classes=2),
+    )
+
+
+@pytest.fixture(name="races")
+def _races(monkeypatch):
+    """Return three races, the last with a driver new to the season."""
+
+    monkeypatch.setitem(Client.cache, "cars", {})
+    monkeypatch.setitem(Client.cache, "__populated", True)
+    custids = list(range(100, 110))
+    return [
+        _race(1001, custids),
+        _race(1002, custids),
+        _race(1003, custids[2:] + [999]),
+    ]
+
+
+def _scanned_position(season: Season, driver_id: int) -> int:
+    """Return the driver's position, ties sharing the higher position."""
+
+    drivers = season.leaderboard.standings
+    points = [x.points for x in drivers if x.driver_id == driver_id][0]
+    return 1 + sum(1 for x in drivers if x.points > points)
+
+
+def test_lookups_match_scans(races):
+    """Indexed race and standing lookups agree with scanning."""
+
+    calendar = synthetic.calendar(1, 1, [1001, 1002, 1003, 1004])
+    for row in calendar["rows"]:
+        row["launchat"] += 4102444800000  # all in the future
+    season = Season(races, SEASON, LEAGUE, calendar)
+
+    for driver in season.leaderboard.standings:
+        summary = season.driver_summary(driver.driver_id, season_info=False)
+        assert summary["driver_id"] == driver.driver_id
+        assert summary["points"] == driver.points
+        assert summary["position"] == _scanned_position(
+            season,
+            driver.driver_id,
+        )
+    assert season.driver_summary(1) == {}
+
+    for race in races:
+        summary = season.race_summary(race.subsessionid, results=False)
+        scanned = [
+            x for x in season.races
+            if x.subsessionid == race.subsessionid
+        ]
+        assert summary["race"]["id"] == scanned[0].subsessionid
+        assert summary["race"]["winner"]["id"] == scanned[0].winner_id
+    assert season.race_summary(1) == {}
+
+    known = {x.subsessionid for x in season.races}
+    unknown = [x for x in calendar["rows"] if x["subsessionid"] not in known]
+    assert len(season.calendar_summary) == len(unknown) == 3
+
+
+def test_add_invalidates_memoized(races):
+    """Standings and summaries are rebuilt after a race is added."""
+
+    season = Season(races[:2], SEASON, LEAGUE)
+    standings = season.standings
+    assert season.standings is standings
+    summary = season.driver_summary(102)
+    assert season.driver_summary(102) is summary
+    assert season.driver_summary(999) == {}
+
+    season.add(races[2])
+
+    assert season.standings is not standings
+    assert 999 in [x.driver_id for x in season.standings]
+    assert season.driver_summary(999)["raced"] == 1
+    updated = season.driver_summary(102)
+    assert updated is not summary
+    assert updated["raced"] == 3
+    assert updated["races"] == 3
+    assert updated["position"] == _scanned_position(season, 102)
@@ -0,0 +1,294 @@
+"""Tests for the stats client."""
+
+
+import os
+import json
+import stat
+import time
+import threading
+
+from requests import Response
+
+from irace.stats.client import Stats
+from irace.stats.transport import Cancelled
+from irace.stats.transport import _Client
+from irace.stats import utils
+from irace.stats.search import SeasonOptions
+
+
+# two rows of a season standings response, numbered keys and encoding as sent
+STANDINGS = json.dumps({
+    "m": {
+        "1": "rank",
+        "2": "custid",
+        "3": "displayname",
+        "4": "clubname",
+        "5": "points",
+        "6": "wins",
+        "7": "irating",
+    },
+    "d": {
+        "27": 2,
+        "r": [
+            {"1": 1, "2": 101, "3": "Jane%2BDoe", "4": "New%2BEngland",
+             "5": 412, "6": 3, "7": 3120},
+            {"1": 2, "2": 102, "3": "Ren%25C3%25A9%2BArnoux",
+             "4": "France", "5": 390, "6": 1, "7": 2875},
+        ],
+    },
+})
+
+
+def _standings(count: int, requested: list) -> Stats:
+    """Return a client with count season standings, recording pages."""
+
+    stats = Stats()
+
+    def _req(url, data=None, **_):  # pylint: disable=unused-argument
+        requested.append(data["start"] // 25 + 1)
+        return {
+            "m": {"1": "custid"},
+            "d": {
+                "r": [{"1": x} for x in range(
+                    data["start"],
+                    min(data["end"], count + 1),
+                )],
+                "27": count,
+            },
+        }
+
+    stats._req = _req  # pylint: disable=protected-access
+    return stats
+
+
+def _members(count: int, requested: list) -> Stats:
+    """Return a client with count league members, recording pages."""
+
+    stats = Stats()
+
+    def _req(url, data=None, **_):  # pylint: disable=unused-argument
+        requested.append(data["lowerBound"] // 25 + 1)
+        return [{"custID": x} for x in range(
+            data["lowerBound"],
+            min(data["upperBound"], count + 1),
+        )]
+
+    stats._req = _req  # pylint: disable=protected-access
+    return stats
+
+
+def test_season_standings_pages():
+    """Standings are fetched up to the last page of the total rows."""
+
+    for count, pages in ((10, [1]), (50, [1, 2]), (60, [1, 2, 3])):
+        requested = []
+        standings = list(_standings(count, requested).iter_season_standings(
+            1,
+            SeasonOptions(1),
+        ))
+        assert [x["custid"] for x in standings] == list(range(1, count + 1))
+        assert sorted(requested) == pages
+
+
+def test_league_members_pages():
+    """Members are only fetched ahead once full pages are returned."""
+
+    for count, pages in ((10, {1}), (25, {1, 2}), (60, {1, 2, 3})):
+        requested = []
+        members = _members(count, requested).league_members(1)
+        assert [x["custID"] for x in members] == list(range(1, count + 1))
+        assert pages <= set(requested) <= pages | {max(pages) + 1}
+
+
+def _coalescing(monkeypatch, send) -> Stats:
+    """Return a logged in client, sending requests with send."""
+
+    monkeypatch.setenv("IRACE_SESSION", "0")
+    stats = Stats()
+    stats._Stats__auth["last"] = time.time()  # pylint: disable=W0212
+
+    def _send(request, priority=None):  # pylint: disable=unused-argument
+        send(request)
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"lapData": []}'  # pylint: disable=W0212
+        response.request = request
+        return response
+
+    stats._send = _send  # pylint: disable=protected-access
+    return stats
+
+
+def _call(func, abort: threading.Event = None):
+    """Call func in a thread, return the thread and its outcome."""
+
+    outcome = []
+
+    def _run():
+        _Client.local.abort = abort
+        try:
+            outcome.append(func())
+        except Exception as error:  # pylint: disable=broad-except
+            outcome.append(error)
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    return thread, outcome
+
+
+def _wait_for(check) -> None:
+    """Wait for check to pass."""
+
+    deadline = time.monotonic() + 5
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert check()
+
+
+def test_coalesced_requests(monkeypatch):
+    """Identical concurrent requests share a single request."""
+
+    sent = []
+    gate = threading.Event()
+
+    def _send(request):
+        sent.append(request)
+        assert gate.wait(5)
+
+    stats = _coalescing(monkeypatch, _send)
+    # pylint: disable=protected-access
+    calls = [_call(lambda: stats.session_laps(1, 1)) for _ in range(4)]
+    _wait_for(lambda: stats._flights.coalesced == 3)
+    gate.set()
+    for thread, _ in calls:
+        thread.join()
+
+    assert len(sent) == 1
+    assert [x for _, x in calls] == [[{"lapData": []}]] * 4
+    assert stats.metrics()["coalesced"] == 3
+
+
+def test_cancelled_leader(monkeypatch):
+    """A cancelled leader's followers retry, an aborted follower stops."""
+
+    sent = []
+    gate = threading.Event()
+
+    def _send(request):
+        sent.append(request)
+        if len(sent) == 1:
+            assert gate.wait(5)
+            raise Cancelled("Request cancelled")
+        # the new leader waits for the other follower to rejoin
+        flights = stats._flights  # pylint: disable=protected-access
+        _wait_for(lambda: flights.coalesced == 4)
+
+    stats = _coalescing(monkeypatch, _send)
+    # pylint: disable=protected-access
+    leader = _call(lambda: stats.session_laps(1, 1))
+    _wait_for(lambda: sent)
+    abort = threading.Event()
+    aborted = _call(lambda: stats.session_laps(1, 1), abort)
+    followers = [_call(lambda: stats.session_laps(1, 1)) for _ in range(2)]
+    _wait_for(lambda: stats._flights.coalesced == 3)
+
+    abort.set()
+    aborted[0].join()
+    assert isinstance(aborted[1][0], Cancelled)
+
+    gate.set()
+    for thread, _ in [leader] + followers:
+        thread.join()
+
+    assert isinstance(leader[1][0], Cancelled)
+    assert [x for _, x in followers] == [[{"lapData": []}]] * 2
+    assert len(sent) == 2
+
+
+def test_concurrent_request_count(monkeypatch):
+    """Requests sent from many threads are all counted."""
+
+    stats = Stats()
+    monkeypatch.setattr(
+        _Client,
+        "send_request",
+        staticmethod(lambda request, priority=None: request),
+    )
+
+    def _worker():
+        for _ in range(1000):
+            stats._send(None)  # pylint: disable=protected-access
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats.num_requests == 8000
+
+
+def test_session_persisted(tmp_path, monkeypatch):
+    """Sessions are stored privately and reused by others until expiry."""
+
+    path = tmp_path / "irace" / "session.json"
+    monkeypatch.setenv("IRACE_SESSION", str(path))
+    monkeypatch.setenv("IRACING_USERNAME", "driver@example.com")
+
+    stats = Stats()
+    auth = stats._Stats__auth  # pylint: disable=protected-access
+    auth.update(cookie="irsso=1", last=time.time(), custid=7)
+    stats._save_session()  # pylint: disable=protected-access
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+
+    other = Stats()
+    # pylint: disable=protected-access
+    assert other._restore_session(auth["max"])
+    other._refresher.cancel()
+    assert other._Stats__auth["cookie"] == "irsso=1"
+    assert other._Stats__auth["custid"] == 7
+
+    auth["last"] = time.time() - auth["max"] - 1
+    stats._save_session()
+    assert not Stats()._restore_session(auth["max"])
+
+    monkeypatch.setenv("IRACING_USERNAME", "someone@example.com")
+    auth["last"] = time.time()
+    stats._save_session()
+    assert not Stats()._restore_session(auth["max"])
+
+
+def test_columnar_standings(monkeypatch):
+    """Compact and dict decoding of a recorded payload agree."""
+
+    stats = Stats()
+    monkeypatch.setattr(stats, "_req", lambda *_, **__: json.loads(
+        STANDINGS
+    ))
+
+    rows, total = stats.season_standings(1, SeasonOptions(1))
+    table, _ = stats.season_standings(1, SeasonOptions(1), compact=True)
+    assert total == 2
+    assert table.to_dicts() == rows
+    assert rows[1] == {
+        "rank": 2,
+        "custid": 102,
+        "displayname": "Ren%25C3%25A9%2BArnoux",
+        "clubname": "France",
+        "points": 390,
+        "wins": 1,
+        "irating": 2875,
+    }
+
+    utils.format_strings(table)
+    assert table.column("displayname") == ["Jane Doe", "Ren\u00e9 Arnoux"]
+
+    table, _ = stats.season_standings(
+        1,
+        SeasonOptions(1),
+        columns=("custid", "points"),
+        compact=True,
+    )
+    assert table.rows == [(101, 412), (102, 390)]
@@ -0,0 +1,103 @@
+"""Tests for the stats response decoding utilities."""
+
+
+from irace.stats import utils
+
+
+HEADER = {"1": "custid", "2": "displayname", "3": "irating"}
+ROWS = [
+    {"1": 1, "2": "Jane%2BDoe", "3": 2500},
+    {"1": 2, "2": "John+Smith", "3": 1350},
+]
+
+
+def test_format_strings():
+    """Strings are double decoded, numbers and lapData are left alone."""
+
+    results = {
+        "name": "A%252BB",
+        "plain": "nothing to do",
+        "rows": [{"club": "New+England"}],
+        "lapData": [{"flags": 0, "ses_time": 9000}],
+        "count": 3,
+    }
+
+    utils.format_strings(results)
+
+    assert results == {
+        "name": "A+B",
+        "plain": "nothing to do",
+        "rows": [{"club": "New England"}],
+        "lapData": [{"flags": 0, "ses_time": 9000}],
+        "count": 3,
+    }
+
+
+def test_format_results_compact():
+    """Tables behave like the list of dictionaries format_results returns."""
+
+    expected = utils.format_results(ROWS, HEADER)
+    table = utils.format_results(ROWS, HEADER, compact=True)
+
+    assert len(table) == 2
+    assert [dict(row) for row in table] == expected
+    assert table.to_dicts() == expected
+    assert table[1]["irating"] == 1350
+    assert table.column("custid") == [1, 2]
+
+    utils.format_strings(table)
+    assert table.column("displayname") == ["Jane Doe", "John Smith"]
+
+
+def test_format_results_columns():
+    """Only the selected columns are kept."""
+
+    assert utils.format_results(ROWS, HEADER, columns=("custid",)) == [
+        {"custid": 1},
+        {"custid": 2},
+    ]
+
+    table = utils.format_results(
+        ROWS,
+        HEADER,
+        columns=("irating", "custid"),
+        compact=True,
+    )
+    assert table.columns == ("irating", "custid")
+    assert table.rows == [(2500, 1), (1350, 2)]
+
+
+def test_format_results_unknown_columns():
+    """Unknown columns are skipped, with or without compact."""
+
+    columns = ("custid", "licenselevel")
+
+    rows = utils.format_results(ROWS, HEADER, columns=columns)
+    table = utils.format_results(ROWS, HEADER, columns=columns, compact=True)
+
+    assert rows == [{"custid": 1}, {"custid": 2}]
+    assert table.columns == ("custid",)
+    assert table.to_dicts() == rows
+
+
+def test_get_irservice_vars_skips_corrupt():
+    """One corrupt listing doesn't lose the others."""
+
+    resp = "\n".join((
+        "var CarListing = extractJSON('[{\"id\":1,\"name\":\"MX-5\"}]');",
+        "var TrackListing = extractJSON('[{\"id\":2,,]');",
+        "var CarClassListing = extractJSON('[{\"noid\":3}]');",
+        "var SeasonListing = extractJSON('[{\"seasonid\":4}]');",
+    ))
+
+    found = utils.get_irservice_vars((
+        "CarListing",
+        "TrackListing",
+        "CarClassListing",
+        "SeasonListing",
+    ), resp)
+
+    assert found == {
+        "CarListing": {1: {"id": 1, "name": "MX-5"}},
+        "SeasonListing": [{"seasonid": 4}],
+    }